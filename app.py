@@ -6,15 +6,58 @@ Autor: John Triguero
 Modulo 8 - Master en Python Avanzado Aplicado al Deporte
 Sports Data Campus
 """
-import streamlit as st
-import sys
-from pathlib import Path
+from common.bootstrap import st, AuthManager, Utils, get_stats_controller
 
-root_path = Path(__file__).parent
-sys.path.insert(0, str(root_path))
+MAIN_HEADER_HTML = "<h1 class='main-header'>Football Analytics Dashboard</h1>"
+WELCOME_SUBHEADER_HTML = "<p class='sub-header'>Analisis avanzado de datos de La Liga</p>"
+LOGIN_SUBHEADER_HTML = "<p class='sub-header'>Master en Python Avanzado Aplicado al Deporte</p>"
 
-from common import Config, AuthManager
-from controllers import StatsController, ExportController
+SIDEBAR_MENU_MD = """
+- **Dashboard**: Vista general de La Liga
+- **Analisis Jugadores**: Estadisticas de jugadores
+- **Comparacion**: Comparar equipos
+"""
+
+SIDEBAR_SOURCES_MD = """
+- Base de Datos SQLite
+- API Externa de Futbol
+"""
+
+INFO_BOX_HTML = """
+<div class='info-box'>
+    <strong>Bienvenido al Dashboard</strong><br>
+    Utilice el menu lateral para navegar entre las diferentes secciones:
+    <ul>
+        <li><strong>Dashboard</strong>: Clasificacion, resultados y proximos partidos</li>
+        <li><strong>Analisis Jugadores</strong>: Estadisticas detalladas de jugadores</li>
+        <li><strong>Comparacion Equipos</strong>: Compare el rendimiento de dos equipos</li>
+    </ul>
+</div>
+"""
+
+DATABASE_INFO_MD = """
+La aplicacion se conecta a una base de datos SQLite local que contiene:
+- Informacion de equipos de La Liga
+- Estadisticas de jugadores
+- Historico de partidos
+- Metricas de rendimiento
+"""
+
+API_INFO_MD = """
+Adicionalmente, se obtienen datos de una API externa:
+- Clasificacion actualizada
+- Proximos partidos
+- Resultados recientes
+- Goleadores de la temporada
+"""
+
+FOOTER_HTML = """
+<div class='footer'>
+    Football Analytics Dashboard | John Triguero<br>
+    Modulo 8 - Master en Python Avanzado Aplicado al Deporte<br>
+    Sports Data Campus
+</div>
+"""
 
 
 def setup_page_config():
@@ -32,79 +75,7 @@ def setup_page_config():
 
 def apply_custom_styles():
     """Aplica estilos CSS personalizados a la aplicacion."""
-    st.markdown("""
-        <style>
-        .main-header {
-            font-size: 2.5rem;
-            font-weight: bold;
-            color: #1E88E5;
-            text-align: center;
-            margin-bottom: 1rem;
-        }
-        
-        .sub-header {
-            font-size: 1.2rem;
-            color: #616161;
-            text-align: center;
-            margin-bottom: 2rem;
-        }
-        
-        .stMetric {
-            background-color: #f8f9fa;
-            padding: 15px;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        
-        .stMetric label {
-            color: #1E88E5 !important;
-            font-weight: bold;
-        }
-        
-        div[data-testid="stSidebarNav"] {
-            background-color: #f8f9fa;
-            padding-top: 1rem;
-        }
-        
-        .sidebar-content {
-            padding: 1rem;
-        }
-        
-        .footer {
-            text-align: center;
-            color: #9E9E9E;
-            font-size: 0.8rem;
-            margin-top: 2rem;
-            padding-top: 1rem;
-            border-top: 1px solid #e0e0e0;
-        }
-        
-        .info-box {
-            background-color: #E3F2FD;
-            padding: 1rem;
-            border-radius: 8px;
-            border-left: 4px solid #1E88E5;
-            margin: 1rem 0;
-        }
-        
-        .warning-box {
-            background-color: #FFF3E0;
-            padding: 1rem;
-            border-radius: 8px;
-            border-left: 4px solid #FF9800;
-            margin: 1rem 0;
-        }
-        
-        @media print {
-            .stSidebar {
-                display: none;
-            }
-            .stButton {
-                display: none;
-            }
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(Utils.load_stylesheet("app.css"), unsafe_allow_html=True)
 
 
 def render_sidebar(auth):
@@ -115,34 +86,28 @@ def render_sidebar(auth):
         
         if auth.is_authenticated():
             st.markdown("### Menu de Navegacion")
-            st.markdown("""
-            - **Dashboard**: Vista general de La Liga
-            - **Analisis Jugadores**: Estadisticas de jugadores
-            - **Comparacion**: Comparar equipos
-            """)
+            st.markdown(SIDEBAR_MENU_MD)
             
             st.markdown("---")
             
             st.markdown("### Fuentes de Datos")
-            st.markdown("""
-            - Base de Datos SQLite
-            - API Externa de Futbol
-            """)
+            st.markdown(SIDEBAR_SOURCES_MD)
             
             auth.render_logout_button()
         else:
             st.info("Inicie sesion para acceder al contenido")
 
 
-def render_welcome_page():
-    """Renderiza la pagina de bienvenida para usuarios autenticados."""
-    st.markdown("<h1 class='main-header'>Football Analytics Dashboard</h1>", unsafe_allow_html=True)
-    st.markdown("<p class='sub-header'>Analisis avanzado de datos de La Liga</p>", unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    controller = StatsController()
-    metrics = controller.get_dashboard_metrics()
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_dashboard_metrics():
+    """Obtiene las metricas del dashboard, cacheadas durante el TTL."""
+    return get_stats_controller().get_dashboard_metrics()
+
+
+@st.fragment
+def render_metrics_block():
+    """Renderiza las metricas principales como fragmento con rerun aislado."""
+    metrics = _fetch_dashboard_metrics()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -157,20 +122,20 @@ def render_welcome_page():
     
     with col4:
         st.metric("Lider", metrics['lider'], delta=f"{metrics['lider_puntos']} pts")
+
+
+def render_welcome_page():
+    """Renderiza la pagina de bienvenida para usuarios autenticados."""
+    st.markdown(MAIN_HEADER_HTML, unsafe_allow_html=True)
+    st.markdown(WELCOME_SUBHEADER_HTML, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    render_metrics_block()
     
     st.markdown("---")
     
-    st.markdown("""
-    <div class='info-box'>
-        <strong>Bienvenido al Dashboard</strong><br>
-        Utilice el menu lateral para navegar entre las diferentes secciones:
-        <ul>
-            <li><strong>Dashboard</strong>: Clasificacion, resultados y proximos partidos</li>
-            <li><strong>Analisis Jugadores</strong>: Estadisticas detalladas de jugadores</li>
-            <li><strong>Comparacion Equipos</strong>: Compare el rendimiento de dos equipos</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(INFO_BOX_HTML, unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -178,35 +143,17 @@ def render_welcome_page():
     
     with col_a:
         st.subheader("Conexion a Base de Datos")
-        st.markdown("""
-        La aplicacion se conecta a una base de datos SQLite local que contiene:
-        - Informacion de equipos de La Liga
-        - Estadisticas de jugadores
-        - Historico de partidos
-        - Metricas de rendimiento
-        """)
+        st.markdown(DATABASE_INFO_MD)
         st.success("Base de datos conectada correctamente")
     
     with col_b:
         st.subheader("Conexion a API Externa")
-        st.markdown("""
-        Adicionalmente, se obtienen datos de una API externa:
-        - Clasificacion actualizada
-        - Proximos partidos
-        - Resultados recientes
-        - Goleadores de la temporada
-        """)
+        st.markdown(API_INFO_MD)
         st.success("API externa disponible")
     
     st.markdown("---")
     
-    st.markdown("""
-    <div class='footer'>
-        Football Analytics Dashboard | John Triguero<br>
-        Modulo 8 - Master en Python Avanzado Aplicado al Deporte<br>
-        Sports Data Campus
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 def main():
@@ -214,14 +161,13 @@ def main():
     setup_page_config()
     apply_custom_styles()
     
-    config = Config()
     auth = AuthManager()
     
     render_sidebar(auth)
     
     if not auth.is_authenticated():
-        st.markdown("<h1 class='main-header'>Football Analytics Dashboard</h1>", unsafe_allow_html=True)
-        st.markdown("<p class='sub-header'>Master en Python Avanzado Aplicado al Deporte</p>", unsafe_allow_html=True)
+        st.markdown(MAIN_HEADER_HTML, unsafe_allow_html=True)
+        st.markdown(LOGIN_SUBHEADER_HTML, unsafe_allow_html=True)
         auth.render_login_form()
     else:
         render_welcome_page()
@@ -1,8 +1,8 @@
 """
 Modulo common - Utilidades compartidas de la aplicacion.
 """
-from .config import Config
+from .config import Config, CONFIG, get_config
 from .utils import Utils
 from .auth import AuthManager
 
-__all__ = ['Config', 'Utils', 'AuthManager']
+__all__ = ['Config', 'CONFIG', 'get_config', 'Utils', 'AuthManager']
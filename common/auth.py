@@ -2,25 +2,29 @@
 Modulo de autenticacion y manejo de sesiones.
 Implementa el sistema de login y control de acceso.
 """
+import hmac
 import streamlit as st
-from .config import Config
+from .config import CONFIG
+from .utils import Utils
 
 
 class AuthManager:
     """Gestor de autenticacion y sesiones de usuario."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = CONFIG
         self._initialize_session_state()
     
     def _initialize_session_state(self):
         """Inicializa las variables de estado de sesion."""
-        if 'authenticated' not in st.session_state:
-            st.session_state.authenticated = False
-        if 'username' not in st.session_state:
-            st.session_state.username = None
-        if 'login_attempts' not in st.session_state:
-            st.session_state.login_attempts = 0
+        session = st.session_state
+        if not session.get('_auth_init'):
+            session.update(
+                authenticated=False,
+                username=None,
+                login_attempts=0,
+                _auth_init=True
+            )
     
     def validate_credentials(self, username, password):
         """
@@ -33,8 +37,10 @@ class AuthManager:
         Returns:
             bool: True si las credenciales son validas
         """
-        return (username == self.config.admin_user and 
-                password == self.config.admin_password)
+        config = self.config
+        user_ok = hmac.compare_digest(config._admin_user_digest, config.digest(username))
+        password_ok = hmac.compare_digest(config._admin_password_digest, config.digest(password))
+        return user_ok & password_ok
     
     def login(self, username, password):
         """
@@ -60,6 +66,7 @@ class AuthManager:
         """Cierra la sesion del usuario."""
         st.session_state.authenticated = False
         st.session_state.username = None
+        st.cache_data.clear()
     
     def is_authenticated(self):
         """
@@ -90,23 +97,7 @@ class AuthManager:
     
     def render_login_form(self):
         """Renderiza el formulario de login."""
-        st.markdown("""
-            <style>
-            .login-container {
-                max-width: 400px;
-                margin: 0 auto;
-                padding: 40px;
-                background-color: #f8f9fa;
-                border-radius: 10px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }
-            .login-title {
-                text-align: center;
-                color: #1E88E5;
-                margin-bottom: 30px;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+        st.markdown(Utils.load_stylesheet("login.css"), unsafe_allow_html=True)
         
         col1, col2, col3 = st.columns([1, 2, 1])
         
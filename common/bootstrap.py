@@ -0,0 +1,34 @@
+"""
+Modulo de arranque compartido por las paginas.
+Reexporta las dependencias comunes de las paginas, de modo que cada cambio
+de pagina resuelve sus imports desde sys.modules.
+
+Quien lo importa debe tener ya la raiz del proyecto en sys.path: app.py la
+tiene por estar en ella y cada pagina la anade antes de importar este modulo.
+
+No se importa desde common/__init__ porque depende de controllers, que a su
+vez importa common.
+"""
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from common import AuthManager, Utils
+from controllers import (
+    StatsController,
+    ExportController,
+    get_stats_controller,
+    get_session_players,
+    get_session_players_indexed,
+    get_session_scorers,
+    clear_session_data,
+)
+
+__all__ = [
+    'st', 'np', 'pd', 'px', 'go', 'AuthManager', 'Utils',
+    'StatsController', 'ExportController', 'get_stats_controller',
+    'get_session_players', 'get_session_players_indexed', 'get_session_scorers',
+    'clear_session_data',
+]
@@ -3,44 +3,82 @@ Modulo de configuracion de la aplicacion.
 Carga variables de entorno y proporciona acceso centralizado a la configuracion.
 """
 import os
+import hashlib
+import functools
+from dataclasses import dataclass, field
 from pathlib import Path
-from dotenv import load_dotenv
 
+_ROOT_DIR = Path(__file__).resolve().parent.parent
+_ENV_PATH = _ROOT_DIR / '.env'
 
+
+def _load_env_file(env_path):
+    """
+    Carga un archivo .env en os.environ sin sobrescribir variables existentes.
+    
+    Args:
+        env_path: Ruta al archivo .env
+    """
+    try:
+        lines = env_path.read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return
+    
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.removeprefix('export ').strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+            value = value[1:-1]
+        os.environ.setdefault(key, value)
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Clase de configuracion centralizada."""
-    
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def __init__(self):
-        if not Config._initialized:
-            self._load_environment()
-            Config._initialized = True
-    
-    def _load_environment(self):
-        """Carga las variables de entorno desde el archivo .env"""
-        env_path = Path(__file__).parent.parent / '.env'
-        load_dotenv(env_path)
-        
-        self.app_name = os.getenv('APP_NAME', 'Football Analytics Dashboard')
-        self.app_version = os.getenv('APP_VERSION', '1.0.0')
-        self.admin_user = os.getenv('ADMIN_USER', 'admin')
-        self.admin_password = os.getenv('ADMIN_PASSWORD', 'admin')
-        self.database_path = os.getenv('DATABASE_PATH', 'data/football.db')
-        self.api_url = os.getenv('FOOTBALL_API_URL', '')
-        self.api_key = os.getenv('FOOTBALL_API_KEY', '')
-        self.cache_ttl = int(os.getenv('CACHE_TTL', '3600'))
+    """Clase de configuracion centralizada (inmutable, resuelta una sola vez)."""
+    
+    app_name: str
+    app_version: str
+    admin_user: str
+    admin_password: str
+    database_path: str
+    api_url: str
+    api_key: str
+    cache_ttl: int
+    _admin_user_digest: bytes = field(init=False, repr=False, compare=False)
+    _admin_password_digest: bytes = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precalcula los digests de las credenciales para comparaciones en tiempo constante."""
+        object.__setattr__(self, '_admin_user_digest', self.digest(self.admin_user))
+        object.__setattr__(self, '_admin_password_digest', self.digest(self.admin_password))
+    
+    @staticmethod
+    def digest(value):
+        """Retorna el SHA-256 de una cadena, usado para comparar credenciales."""
+        return hashlib.sha256(value.encode('utf-8')).digest()
+    
+    @classmethod
+    def from_environment(cls):
+        """Construye la configuracion desde las variables de entorno."""
+        return cls(
+            app_name=os.getenv('APP_NAME', 'Football Analytics Dashboard'),
+            app_version=os.getenv('APP_VERSION', '1.0.0'),
+            admin_user=os.getenv('ADMIN_USER', 'admin'),
+            admin_password=os.getenv('ADMIN_PASSWORD', 'admin'),
+            database_path=os.getenv('DATABASE_PATH', 'data/football.db'),
+            api_url=os.getenv('FOOTBALL_API_URL', ''),
+            api_key=os.getenv('FOOTBALL_API_KEY', ''),
+            cache_ttl=int(os.getenv('CACHE_TTL', '3600')),
+        )
     
     @property
     def db_full_path(self):
         """Retorna la ruta completa de la base de datos."""
-        return Path(__file__).parent.parent / self.database_path
+        return _ROOT_DIR / self.database_path
     
     def get_api_headers(self):
         """Retorna los headers para las peticiones a la API."""
@@ -48,3 +86,18 @@ class Config:
             'X-Auth-Token': self.api_key,
             'Content-Type': 'application/json'
         }
+
+
+@functools.cache
+def get_config():
+    """
+    Carga el archivo .env y retorna la configuracion del proceso.
+    
+    Returns:
+        Config: Instancia unica de configuracion
+    """
+    _load_env_file(_ENV_PATH)
+    return Config.from_environment()
+
+
+CONFIG = get_config()
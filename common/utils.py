@@ -3,16 +3,88 @@ Modulo de utilidades generales.
 Contiene funciones auxiliares utilizadas en toda la aplicacion.
 """
 import io
-import base64
-from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+import functools
+from datetime import date, datetime
+from pathlib import Path
+import streamlit as st
+import numpy as np
 import pandas as pd
 
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+STATIC_DIR = Path(__file__).parent.parent / 'static'
+
+# Alturas fijas (puntos) coherentes con los FONTSIZE y PADDING de la tabla PDF
+PDF_HEADER_ROW_HEIGHT = 10 * 1.2 + 24
+PDF_BODY_ROW_HEIGHT = 8 * 1.2 + 16
+
+# Formateadores precompilados por numero de decimales para Utils.format_number
+_NUMBER_FORMATTERS = {d: f"{{:,.{d}f}}".format for d in range(8)}
+_THOUSANDS_TO_SPACE = str.maketrans(',', ' ')
+
+@functools.cache
+def _pdf_styles():
+    """
+    Construye (una sola vez) los estilos de Utils.dataframe_to_pdf.
+    
+    ReportLab se importa aqui y no a nivel de modulo para que el login y la
+    pagina de bienvenida no paguen su coste de importacion.
+    
+    Returns:
+        dict: Estilos 'title', 'date', 'footer' y 'table'
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    
+    sample_styles = getSampleStyleSheet()
+    
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sample_styles['Heading1'],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#1E88E5')
+        ),
+        'date': ParagraphStyle(
+            'DateStyle',
+            parent=sample_styles['Normal'],
+            fontSize=10,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            textColor=colors.grey
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=sample_styles['Normal'],
+            fontSize=8,
+            alignment=TA_CENTER,
+            textColor=colors.grey
+        ),
+        'table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E88E5')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('TOPPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F5F5F5')]),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+            ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ]),
+    }
 
 class Utils:
     """Clase con utilidades generales de la aplicacion."""
@@ -21,16 +93,53 @@ class Utils:
     def format_date(date_str, input_format='%Y-%m-%d', output_format='%d/%m/%Y'):
         """Formatea una fecha de un formato a otro."""
         try:
-            date_obj = datetime.strptime(date_str, input_format)
+            if input_format == '%Y-%m-%d' and len(date_str) == 10:
+                date_obj = date.fromisoformat(date_str)
+            else:
+                date_obj = datetime.strptime(date_str, input_format)
             return date_obj.strftime(output_format)
         except (ValueError, TypeError):
             return date_str
     
+    @staticmethod
+    def format_date_series(series, input_format='%Y-%m-%d', output_format='%d/%m/%Y'):
+        """
+        Formatea una columna completa de fechas de un formato a otro.
+        
+        Args:
+            series: Serie de pandas con fechas en texto
+            input_format: Formato de entrada
+            output_format: Formato de salida
+        
+        Returns:
+            pd.Series: Fechas formateadas; los valores no parseables se conservan
+        """
+        parsed = pd.to_datetime(series, format=input_format, errors='coerce', cache=True)
+        return parsed.dt.strftime(output_format).where(parsed.notna(), series)
+    
+    @staticmethod
+    def format_timestamp(moment=None):
+        """
+        Formatea una marca de tiempo como dd/mm/YYYY HH:MM sin pasar por strftime.
+        
+        Args:
+            moment: datetime a formatear (por defecto, el instante actual)
+        
+        Returns:
+            str: Fecha y hora formateadas
+        """
+        if moment is None:
+            moment = datetime.now()
+        return f"{moment.day:02d}/{moment.month:02d}/{moment.year} {moment.hour:02d}:{moment.minute:02d}"
+    
     @staticmethod
     def format_number(number, decimals=2):
         """Formatea un numero con separador de miles."""
         try:
-            return f"{float(number):,.{decimals}f}".replace(',', ' ')
+            formatter = _NUMBER_FORMATTERS.get(decimals)
+            if formatter is None:
+                formatter = f"{{:,.{decimals}f}}".format
+            return formatter(float(number)).translate(_THOUSANDS_TO_SPACE)
         except (ValueError, TypeError):
             return str(number)
     
@@ -44,6 +153,70 @@ class Utils:
         except (ValueError, TypeError, ZeroDivisionError):
             return 0.0
     
+    @staticmethod
+    @st.cache_resource(show_spinner=False)
+    def load_stylesheet(filename):
+        """
+        Lee una hoja de estilos de la carpeta static una sola vez por proceso.
+        
+        Args:
+            filename: Nombre del archivo CSS dentro de static/
+        
+        Returns:
+            str: Bloque <style> listo para st.markdown
+        """
+        css = (STATIC_DIR / filename).read_text(encoding='utf-8')
+        return f"<style>\n{css}</style>"
+    
+    @staticmethod
+    def dataframe_rows(df):
+        """
+        Convierte un DataFrame en una lista de filas extrayendo columna a columna.
+        
+        Cada columna se convierte con Series.tolist(), que para columnas
+        respaldadas por Arrow usa to_pylist en C++, evitando el array 2D de
+        objetos que genera df.values.
+        
+        Args:
+            df: DataFrame a convertir
+        
+        Returns:
+            list: Lista de filas (listas de valores Python)
+        """
+        columns = [df.iloc[:, i].tolist() for i in range(df.shape[1])]
+        return [list(row) for row in zip(*columns)]
+    
+    @staticmethod
+    def _column_widths(df, available_width):
+        """
+        Calcula anchos de columna proporcionales al texto mas largo de cada una.
+        
+        Args:
+            df: DataFrame a maquetar
+            available_width: Ancho total disponible en puntos
+        
+        Returns:
+            list: Anchos de columna en puntos
+        """
+        value_lengths = df.astype(str).apply(lambda col: col.str.len().max()).to_numpy(dtype=float)
+        header_lengths = df.columns.astype(str).str.len().to_numpy(dtype=float)
+        lengths = np.maximum(np.maximum(value_lengths, header_lengths), 1.0)
+        return (available_width * lengths / lengths.sum()).tolist()
+    
+    @staticmethod
+    def hash_dataframe(df):
+        """
+        Calcula una clave de cache a partir del contenido completo de un DataFrame.
+        
+        Args:
+            df: DataFrame a resumir
+        
+        Returns:
+            tuple: Columnas y hash de todas las filas (incluido el indice)
+        """
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        return tuple(map(str, df.columns)), row_hashes.tobytes()
+    
     @staticmethod
     def dataframe_to_pdf(df, title, filename=None):
         """
@@ -56,92 +229,21 @@ class Utils:
         
         Returns:
             bytes: Contenido del PDF
-        """
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=1.5*cm,
-            leftMargin=1.5*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
-        
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#1E88E5')
-        )
-        elements.append(Paragraph(title, title_style))
-        
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-        current_date = datetime.now().strftime('%d/%m/%Y %H:%M')
-        elements.append(Paragraph(f"Generado: {current_date}", date_style))
-        elements.append(Spacer(1, 20))
-        
-        if df is not None and not df.empty:
-            table_data = [df.columns.tolist()] + df.values.tolist()
-            
-            col_widths = []
-            available_width = A4[0] - 3*cm
-            num_cols = len(df.columns)
-            col_width = available_width / num_cols
-            col_widths = [col_width] * num_cols
-            
-            table = Table(table_data, colWidths=col_widths)
-            
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E88E5')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F5F5F5')]),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ])
-            table.setStyle(table_style)
-            elements.append(table)
-        
-        elements.append(Spacer(1, 30))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-        elements.append(Paragraph("Football Analytics Dashboard - John Triguero", footer_style))
         
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer.getvalue()
+        El resultado se cachea por contenido del DataFrame, titulo y minuto de
+        generacion, por lo que exportar dos veces los mismos datos no vuelve a
+        maquetar el PDF y la fecha impresa nunca queda desfasada.
+        """
+        return _build_dataframe_pdf(df, title, Utils.format_timestamp())
     
     @staticmethod
     def get_download_link(data, filename, text):
         """
         Genera un enlace de descarga para datos binarios.
         
+        Para PDFs grandes es preferible st.download_button, que sirve los
+        bytes directamente sin codificarlos en base64.
+        
         Args:
             data: Datos binarios a descargar
             filename: Nombre del archivo
@@ -150,14 +252,68 @@ class Utils:
         Returns:
             str: HTML del enlace de descarga
         """
-        b64 = base64.b64encode(data).decode()
+        b64 = base64.b64encode(data).decode('ascii')
         return f'<a href="data:application/pdf;base64,{b64}" download="{filename}">{text}</a>'
     
     @staticmethod
-    def clean_dataframe(df):
-        """Limpia un DataFrame eliminando valores nulos y duplicados."""
+    def clean_dataframe(df, subset=None):
+        """
+        Limpia un DataFrame eliminando valores nulos y duplicados.
+        
+        Args:
+            df: DataFrame a limpiar
+            subset: Columnas que identifican un duplicado (opcional, por defecto todas)
+        
+        Returns:
+            pd.DataFrame: DataFrame sin duplicados y con nulos sustituidos por '-'
+        """
         if df is None:
             return pd.DataFrame()
-        df_clean = df.drop_duplicates()
+        df_clean = df.drop_duplicates(subset=subset)
         df_clean = df_clean.fillna('-')
         return df_clean
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False,
+               hash_funcs={pd.DataFrame: Utils.hash_dataframe})
+def _build_dataframe_pdf(df, title, generated):
+    """Genera el PDF de Utils.dataframe_to_pdf (cacheado por contenido y fecha)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+    
+    styles = _pdf_styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=1.5*cm,
+        leftMargin=1.5*cm,
+        topMargin=2*cm,
+        bottomMargin=2*cm
+    )
+    
+    elements = []
+    elements.append(Paragraph(title, styles['title']))
+    
+    elements.append(Paragraph(f"Generado: {generated}", styles['date']))
+    elements.append(Spacer(1, 20))
+    
+    if df is not None and not df.empty:
+        table_data = [df.columns.tolist()] + Utils.dataframe_rows(df)
+        
+        available_width = A4[0] - 3*cm
+        col_widths = Utils._column_widths(df, available_width)
+        row_heights = [PDF_HEADER_ROW_HEIGHT] + [PDF_BODY_ROW_HEIGHT] * len(df)
+        
+        table = Table(table_data, colWidths=col_widths, rowHeights=row_heights)
+        
+        table.setStyle(styles['table'])
+        elements.append(table)
+    
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph("Football Analytics Dashboard - John Triguero", styles['footer']))
+    
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer.getvalue()
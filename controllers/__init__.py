@@ -1,7 +1,18 @@
 """
 Modulo controllers - Logica de negocio de la aplicacion.
 """
-from .stats_controller import StatsController
+from .stats_controller import (
+    StatsController,
+    get_stats_controller,
+    get_session_players,
+    get_session_players_indexed,
+    get_session_scorers,
+    clear_session_data,
+)
 from .export_controller import ExportController
 
-__all__ = ['StatsController', 'ExportController']
+__all__ = [
+    'StatsController', 'ExportController', 'get_stats_controller',
+    'get_session_players', 'get_session_players_indexed', 'get_session_scorers',
+    'clear_session_data',
+]
@@ -3,72 +3,263 @@ Controlador de exportacion.
 Gestiona la generacion de PDFs y exportacion de datos.
 """
 import io
+import logging
+import functools
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import pandas as pd
+import numpy as np
+from common import Utils
 
+# Acelerador C de ReportLab (paquete rl_accel); basta con saber si esta instalado
+HAS_RL_ACCEL = importlib.util.find_spec('_rl_accel') is not None
 
-class ExportController:
-    """Controlador para exportacion de datos y generacion de PDFs."""
+_accel_warning_shown = False
+
+logger = logging.getLogger(__name__)
+
+# Prefijo de las claves de session_state con PDFs preparados bajo demanda
+PDF_EXPORT_STATE_PREFIX = 'pdf_export_'
+
+# Un buffer reutilizable por hilo para construir los PDFs
+_buffer_pool = threading.local()
+
+
+def _pooled_buffer():
+    """
+    Retorna el buffer del hilo actual, vaciado y listo para escribir.
     
-    def __init__(self):
-        """Inicializa el controlador de exportacion."""
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+    Returns:
+        io.BytesIO: Buffer reutilizable
+    """
+    buffer = getattr(_buffer_pool, 'buffer', None)
+    if buffer is None:
+        buffer = io.BytesIO()
+        _buffer_pool.buffer = buffer
+    else:
+        buffer.seek(0)
+        buffer.truncate(0)
+    return buffer
+
+
+def _top_k_positions(values, k):
+    """
+    Selecciona las posiciones de los k valores mayores sin ordenar todo el array.
+    
+    Args:
+        values: Array numerico de punto flotante
+        k: Numero de posiciones a retornar
+    
+    Returns:
+        np.ndarray: Posiciones ordenadas de mayor a menor valor, igual que
+        Series.nlargest(keep='first'): los empates se resuelven por posicion y
+        los NaN solo aparecen, al final, si faltan valores para llegar a k
+    """
+    missing = np.isnan(values)
+    valid = np.flatnonzero(~missing)
+    candidates = values[valid]
+    n = len(candidates)
+    k_valid = min(k, n)
+    if k_valid == 0:
+        top = np.empty(0, dtype=np.intp)
+    else:
+        kth = np.partition(candidates, n - k_valid)[n - k_valid]
+        above = np.flatnonzero(candidates > kth)
+        ties = np.flatnonzero(candidates == kth)[:k_valid - len(above)]
+        idx = np.sort(np.concatenate([above, ties]))
+        top = valid[idx[np.argsort(-candidates[idx], kind='stable')]]
+    if k > n:
+        top = np.concatenate([top, np.flatnonzero(missing)[:k - n]])
+    return top
+
+
+def _buffer_bytes(buffer):
+    """Copia el contenido del buffer a bytes sin retener vistas sobre el."""
+    with buffer.getbuffer() as view:
+        return bytes(view)
+
+# Colores corporativos usados en todos los documentos
+BLUE = '#1E88E5'
+GREY_BORDER = '#BDBDBD'
+ROW_ALT = '#F5F5F5'
+TEXT_DARK = '#212121'
+GREY_SUB = '#424242'
+
+
+@functools.cache
+def _export_styles():
+    """
+    Construye (una sola vez) los estilos compartidos por los documentos.
+    
+    ReportLab se importa aqui y no a nivel de modulo para que las paginas
+    no paguen su coste de importacion hasta que se exporta un PDF.
     
-    def _setup_custom_styles(self):
-        """Configura estilos personalizados para los documentos."""
-        self.title_style = ParagraphStyle(
+    Returns:
+        dict: Estilos de parrafo y de tabla
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    
+    blue = colors.HexColor(BLUE)
+    row_alt = colors.HexColor(ROW_ALT)
+    sample_styles = getSampleStyleSheet()
+    
+    return {
+        'sample': sample_styles,
+        'title': ParagraphStyle(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=sample_styles['Heading1'],
             fontSize=20,
             spaceAfter=30,
             alignment=TA_CENTER,
-            textColor=colors.HexColor('#1E88E5'),
+            textColor=blue,
             fontName='Helvetica-Bold'
-        )
-        
-        self.subtitle_style = ParagraphStyle(
+        ),
+        'subtitle': ParagraphStyle(
             'CustomSubtitle',
-            parent=self.styles['Heading2'],
+            parent=sample_styles['Heading2'],
             fontSize=14,
             spaceBefore=20,
             spaceAfter=15,
             alignment=TA_LEFT,
-            textColor=colors.HexColor('#424242'),
+            textColor=colors.HexColor(GREY_SUB),
             fontName='Helvetica-Bold'
-        )
-        
-        self.normal_style = ParagraphStyle(
+        ),
+        'normal': ParagraphStyle(
             'CustomNormal',
-            parent=self.styles['Normal'],
+            parent=sample_styles['Normal'],
             fontSize=10,
             spaceAfter=10,
             alignment=TA_LEFT,
-            textColor=colors.HexColor('#212121')
-        )
-        
-        self.footer_style = ParagraphStyle(
+            textColor=colors.HexColor(TEXT_DARK)
+        ),
+        'footer': ParagraphStyle(
             'CustomFooter',
-            parent=self.styles['Normal'],
+            parent=sample_styles['Normal'],
             fontSize=8,
             alignment=TA_CENTER,
             textColor=colors.grey
-        )
+        ),
+        'table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), blue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor(GREY_BORDER)),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, row_alt]),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'summary_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), blue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, row_alt]),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ]),
+    }
+
+
+# Columnas exportadas y su cabecera en el PDF
+PLAYER_COLUMNS = {
+    'nombre': 'Jugador',
+    'posicion': 'Posicion',
+    'nacionalidad': 'Nacionalidad',
+    'edad': 'Edad',
+    'goles': 'Goles',
+    'asistencias': 'Asistencias',
+    'partidos': 'Partidos',
+    'equipo_nombre': 'Equipo',
+}
+
+SCORER_COLUMNS = {
+    'nombre': 'Jugador',
+    'goles': 'Goles',
+    'asistencias': 'Asistencias',
+    'equipo_nombre': 'Equipo',
+}
+
+
+class ExportController:
+    """Controlador para exportacion de datos y generacion de PDFs."""
+    
+    def __init__(self):
+        """Inicializa el controlador de exportacion."""
+        self._warn_missing_accel()
+    
+    @staticmethod
+    def _warn_missing_accel():
+        """
+        Avisa una sola vez por proceso si falta el acelerador C de ReportLab.
+        
+        El aviso va al log y no a la pagina: el controlador se crea dentro de
+        st.cache_resource, que repetiria cualquier elemento de Streamlit en
+        cada acierto de cache.
+        """
+        global _accel_warning_shown
+        if HAS_RL_ACCEL or _accel_warning_shown:
+            return
+        _accel_warning_shown = True
+        logger.warning("ReportLab funciona sin su acelerador C (rl_accel); la exportacion a PDF sera mas lenta.")
+    
+    @property
+    def styles(self):
+        """Hoja de estilos base de ReportLab."""
+        return _export_styles()['sample']
+    
+    @property
+    def title_style(self):
+        """Estilo del titulo principal."""
+        return _export_styles()['title']
     
-    def _create_table_from_df(self, df, col_widths=None):
+    @property
+    def subtitle_style(self):
+        """Estilo de los titulos de seccion."""
+        return _export_styles()['subtitle']
+    
+    @property
+    def normal_style(self):
+        """Estilo del texto normal."""
+        return _export_styles()['normal']
+    
+    @property
+    def footer_style(self):
+        """Estilo del pie y las notas."""
+        return _export_styles()['footer']
+    
+    @property
+    def table_style(self):
+        """Estilo de las tablas de datos."""
+        return _export_styles()['table']
+    
+    @property
+    def summary_table_style(self):
+        """Estilo de la tabla de resumen ejecutivo."""
+        return _export_styles()['summary_table']
+    
+    def _create_table_from_df(self, df, col_widths=None, headers=None):
         """
         Crea una tabla de ReportLab desde un DataFrame.
         
         Args:
             df: DataFrame a convertir
             col_widths: Anchos de columnas (opcional)
+            headers: Cabeceras a mostrar en lugar de los nombres de columna (opcional)
         
         Returns:
             Table: Objeto tabla de ReportLab
@@ -76,7 +267,12 @@ class ExportController:
         if df is None or df.empty:
             return None
         
-        table_data = [df.columns.tolist()] + df.values.tolist()
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.platypus import Table
+        
+        table_data = [list(headers) if headers is not None else df.columns.tolist()]
+        table_data.extend(Utils.dataframe_rows(df))
         
         if col_widths is None:
             available_width = A4[0] - 3*cm
@@ -85,25 +281,7 @@ class ExportController:
         
         table = Table(table_data, colWidths=col_widths)
         
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E88E5')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#BDBDBD')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F5F5F5')]),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ])
-        table.setStyle(table_style)
+        table.setStyle(self.table_style)
         
         return table
     
@@ -118,42 +296,106 @@ class ExportController:
         Returns:
             bytes: Contenido del PDF
         """
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=1.5*cm,
-            leftMargin=1.5*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.pdfgen import canvas
+        from reportlab.platypus import Paragraph
         
-        elements = []
+        buffer = _pooled_buffer()
+        page_width, page_height = A4
+        left = 1.5*cm
+        width = page_width - 3*cm
+        top = page_height - 2*cm
+        bottom = 2*cm
         
-        elements.append(Paragraph("La Liga - Clasificacion", self.title_style))
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        y = top
         
-        current_date = datetime.now().strftime('%d/%m/%Y %H:%M')
-        elements.append(Paragraph(f"Generado: {current_date}", self.footer_style))
-        elements.append(Spacer(1, 20))
+        y = self._draw_flowable(pdf, Paragraph("La Liga - Clasificacion", self.title_style), left, y, width)
+        
+        current_date = Utils.format_timestamp()
+        y = self._draw_flowable(pdf, Paragraph(f"Generado: {current_date}", self.footer_style), left, y, width)
+        y -= 20
         
         if metrics:
             metrics_text = f"Temporada 2024-25 | Lider: {metrics.get('lider', '-')} ({metrics.get('lider_puntos', 0)} pts)"
-            elements.append(Paragraph(metrics_text, self.normal_style))
-            elements.append(Spacer(1, 15))
+            y = self._draw_flowable(pdf, Paragraph(metrics_text, self.normal_style), left, y, width)
+            y -= 15
         
-        elements.append(Paragraph("Tabla de Posiciones", self.subtitle_style))
+        y = self._draw_flowable(pdf, Paragraph("Tabla de Posiciones", self.subtitle_style), left, y, width)
         
         if standings_df is not None and not standings_df.empty:
             table = self._create_table_from_df(standings_df)
-            if table:
-                elements.append(table)
+            if table is not None:
+                y = self._draw_table(pdf, table, left, y, width, top, bottom)
+        
+        y -= 30
+        footer = Paragraph("Football Analytics Dashboard - John Triguero", self.footer_style)
+        if y - footer.wrap(width, y - bottom)[1] < bottom:
+            pdf.showPage()
+            y = top
+        self._draw_flowable(pdf, footer, left, y, width)
+        
+        pdf.showPage()
+        pdf.save()
+        return _buffer_bytes(buffer)
+    
+    @staticmethod
+    def _draw_flowable(pdf, flowable, x, y, width):
+        """
+        Dibuja un flowable directamente sobre el canvas, sin plantilla de documento.
         
-        elements.append(Spacer(1, 30))
-        elements.append(Paragraph("Football Analytics Dashboard - John Triguero", self.footer_style))
+        Args:
+            pdf: Canvas de ReportLab
+            flowable: Flowable a dibujar (parrafo o tabla)
+            x: Coordenada izquierda
+            y: Coordenada superior disponible
+            width: Ancho disponible
         
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer.getvalue()
+        Returns:
+            float: Nueva coordenada superior tras el flowable y sus margenes
+        """
+        y -= flowable.getSpaceBefore()
+        _, height = flowable.wrapOn(pdf, width, y)
+        flowable.drawOn(pdf, x, y - height)
+        return y - height - flowable.getSpaceAfter()
+    
+    @classmethod
+    def _draw_table(cls, pdf, table, x, y, width, top, bottom):
+        """
+        Dibuja una tabla sobre el canvas, partiendola entre paginas si no cabe.
+        
+        Args:
+            pdf: Canvas de ReportLab
+            table: Tabla de ReportLab
+            x: Coordenada izquierda
+            y: Coordenada superior disponible
+            width: Ancho disponible
+            top: Coordenada superior de cada pagina nueva
+            bottom: Margen inferior
+        
+        Returns:
+            float: Nueva coordenada superior tras la tabla
+        """
+        pending = [table]
+        while pending:
+            part = pending.pop(0)
+            _, height = part.wrapOn(pdf, width, y - bottom)
+            if height > y - bottom:
+                pieces = part.split(width, y - bottom)
+                if len(pieces) > 1:
+                    part = pieces[0]
+                    pending[:0] = pieces[1:]
+                elif y < top:
+                    pdf.showPage()
+                    y = top
+                    pending.insert(0, part)
+                    continue
+            y = cls._draw_flowable(pdf, part, x, y, width)
+            if pending:
+                pdf.showPage()
+                y = top
+        return y
     
     def generate_players_pdf(self, players_df, title="Analisis de Jugadores"):
         """
@@ -166,7 +408,11 @@ class ExportController:
         Returns:
             bytes: Contenido del PDF
         """
-        buffer = io.BytesIO()
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        buffer = _pooled_buffer()
         doc = SimpleDocTemplate(
             buffer,
             pagesize=landscape(A4),
@@ -180,19 +426,16 @@ class ExportController:
         
         elements.append(Paragraph(title, self.title_style))
         
-        current_date = datetime.now().strftime('%d/%m/%Y %H:%M')
+        current_date = Utils.format_timestamp()
         elements.append(Paragraph(f"Generado: {current_date}", self.footer_style))
         elements.append(Spacer(1, 20))
         
         if players_df is not None and not players_df.empty:
-            display_cols = ['nombre', 'posicion', 'nacionalidad', 'edad', 'goles', 'asistencias', 'partidos', 'equipo_nombre']
-            available_cols = [col for col in display_cols if col in players_df.columns]
+            available_cols = [col for col in PLAYER_COLUMNS if col in players_df.columns]
             
             if available_cols:
-                display_df = players_df[available_cols].copy()
-                display_df.columns = ['Jugador', 'Posicion', 'Nacionalidad', 'Edad', 'Goles', 'Asistencias', 'Partidos', 'Equipo'][:len(available_cols)]
-                
-                table = self._create_table_from_df(display_df)
+                headers = [PLAYER_COLUMNS[col] for col in available_cols]
+                table = self._create_table_from_df(players_df[available_cols], headers=headers)
                 if table:
                     elements.append(table)
         
@@ -200,8 +443,76 @@ class ExportController:
         elements.append(Paragraph("Football Analytics Dashboard - John Triguero", self.footer_style))
         
         doc.build(elements)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return _buffer_bytes(buffer)
+    
+    def _build_summary_table(self, metrics):
+        """
+        Construye la tabla de resumen ejecutivo del reporte completo.
+        
+        Args:
+            metrics: Metricas del dashboard
+        
+        Returns:
+            Table: Tabla de resumen, o None si no hay metricas
+        """
+        if not metrics:
+            return None
+        
+        from reportlab.lib.units import cm
+        from reportlab.platypus import Table
+        
+        summary_data = [
+            ['Metrica', 'Valor'],
+            ['Total Equipos', str(metrics.get('total_equipos', '-'))],
+            ['Total Jugadores', str(metrics.get('total_jugadores', '-'))],
+            ['Total Goles', str(metrics.get('total_goles', '-'))],
+            ['Lider', metrics.get('lider', '-')],
+            ['Puntos Lider', str(metrics.get('lider_puntos', '-'))],
+        ]
+        
+        summary_table = Table(summary_data, colWidths=[8*cm, 6*cm])
+        summary_table.setStyle(self.summary_table_style)
+        return summary_table
+    
+    def _build_standings_table(self, standings_df):
+        """
+        Construye la tabla con los 10 primeros clasificados.
+        
+        Args:
+            standings_df: DataFrame con clasificacion
+        
+        Returns:
+            Table: Tabla de clasificacion, o None si no hay datos
+        """
+        if standings_df is None or standings_df.empty:
+            return None
+        return self._create_table_from_df(standings_df.head(10))
+    
+    def _build_scorers_table(self, players_df):
+        """
+        Construye la tabla con los 10 maximos goleadores.
+        
+        Args:
+            players_df: DataFrame con jugadores
+        
+        Returns:
+            Table: Tabla de goleadores, o None si no hay datos
+        """
+        if players_df is None or players_df.empty:
+            return None
+        
+        if 'goles' in players_df.columns:
+            goals = players_df['goles'].to_numpy(dtype=np.float64, na_value=np.nan)
+            top_scorers = players_df.iloc[_top_k_positions(goals, 10)]
+        else:
+            top_scorers = players_df.head(10)
+        
+        available_cols = [col for col in SCORER_COLUMNS if col in top_scorers.columns]
+        if not available_cols:
+            return None
+        
+        headers = [SCORER_COLUMNS[col] for col in available_cols]
+        return self._create_table_from_df(top_scorers[available_cols], headers=headers)
     
     def generate_full_report_pdf(self, standings_df, players_df, metrics):
         """
@@ -215,7 +526,11 @@ class ExportController:
         Returns:
             bytes: Contenido del PDF
         """
-        buffer = io.BytesIO()
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+        
+        buffer = _pooled_buffer()
         doc = SimpleDocTemplate(
             buffer,
             pagesize=A4,
@@ -230,65 +545,39 @@ class ExportController:
         elements.append(Paragraph("Football Analytics Dashboard", self.title_style))
         elements.append(Paragraph("Reporte Completo - La Liga 2024-25", self.subtitle_style))
         
-        current_date = datetime.now().strftime('%d/%m/%Y %H:%M')
+        current_date = Utils.format_timestamp()
         elements.append(Paragraph(f"Generado: {current_date}", self.footer_style))
         elements.append(Spacer(1, 30))
         
-        elements.append(Paragraph("Resumen Ejecutivo", self.subtitle_style))
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            summary_future = executor.submit(self._build_summary_table, metrics)
+            standings_future = executor.submit(self._build_standings_table, standings_df)
+            scorers_future = executor.submit(self._build_scorers_table, players_df)
+            summary_table = summary_future.result()
+            standings_table = standings_future.result()
+            scorers_table = scorers_future.result()
         
-        if metrics:
-            summary_data = [
-                ['Metrica', 'Valor'],
-                ['Total Equipos', str(metrics.get('total_equipos', '-'))],
-                ['Total Jugadores', str(metrics.get('total_jugadores', '-'))],
-                ['Total Goles', str(metrics.get('total_goles', '-'))],
-                ['Lider', metrics.get('lider', '-')],
-                ['Puntos Lider', str(metrics.get('lider_puntos', '-'))],
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[8*cm, 6*cm])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E88E5')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F5F5F5')]),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ]))
+        elements.append(Paragraph("Resumen Ejecutivo", self.subtitle_style))
+        if summary_table is not None:
             elements.append(summary_table)
         
         elements.append(PageBreak())
         
         elements.append(Paragraph("Clasificacion", self.subtitle_style))
-        if standings_df is not None and not standings_df.empty:
-            table = self._create_table_from_df(standings_df.head(10))
-            if table:
-                elements.append(table)
+        if standings_table is not None:
+            elements.append(standings_table)
         
         elements.append(PageBreak())
         
         elements.append(Paragraph("Maximos Goleadores", self.subtitle_style))
-        if players_df is not None and not players_df.empty:
-            top_scorers = players_df.nlargest(10, 'goles') if 'goles' in players_df.columns else players_df.head(10)
-            display_cols = ['nombre', 'goles', 'asistencias', 'equipo_nombre']
-            available_cols = [col for col in display_cols if col in top_scorers.columns]
-            
-            if available_cols:
-                display_df = top_scorers[available_cols].copy()
-                display_df.columns = ['Jugador', 'Goles', 'Asistencias', 'Equipo'][:len(available_cols)]
-                table = self._create_table_from_df(display_df)
-                if table:
-                    elements.append(table)
+        if scorers_table is not None:
+            elements.append(scorers_table)
         
         elements.append(Spacer(1, 30))
         elements.append(Paragraph("Football Analytics Dashboard - John Triguero", self.footer_style))
         
         doc.build(elements)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return _buffer_bytes(buffer)
     
     @staticmethod
     def render_print_button():
@@ -313,18 +602,44 @@ class ExportController:
         st.markdown(print_js, unsafe_allow_html=True)
     
     @staticmethod
-    def render_export_button(pdf_data, filename):
+    def render_export_button(pdf_data, filename, key=None):
         """
         Renderiza el boton de exportar a PDF.
         
         Args:
             pdf_data: Datos del PDF
             filename: Nombre del archivo
+            key: Clave del widget (opcional)
         """
         st.download_button(
             label="Exportar a PDF",
             data=pdf_data,
             file_name=filename,
             mime="application/pdf",
-            use_container_width=False
+            use_container_width=False,
+            key=key
         )
+    
+    @classmethod
+    def render_lazy_export_button(cls, build_pdf, filename, key, stamp=None):
+        """
+        Renderiza la exportacion a PDF generando el documento solo bajo demanda.
+        
+        El PDF se construye al pulsar "Preparar PDF" y se guarda en
+        session_state junto con el sello de los datos de entrada, de modo que
+        los reruns posteriores no lo regeneran y un PDF de datos ya
+        desactualizados no vuelve a ofrecerse.
+        
+        Args:
+            build_pdf: Funcion sin argumentos que retorna los bytes del PDF
+            filename: Nombre del archivo
+            key: Clave unica de la exportacion dentro de la pagina
+            stamp: Valor comparable que identifica los datos del PDF
+        """
+        state_key = f"{PDF_EXPORT_STATE_PREFIX}{key}"
+        if st.button("Preparar PDF", key=f"{state_key}_prepare"):
+            st.session_state[state_key] = (stamp, build_pdf())
+        
+        entry = st.session_state.get(state_key)
+        if entry is not None and entry[0] == stamp:
+            cls.render_export_button(entry[1], filename, key=f"{state_key}_download")
@@ -2,20 +2,52 @@
 Controlador de estadisticas.
 Gestiona la logica de procesamiento de datos estadisticos.
 """
+import time
+from functools import cached_property, wraps
 import pandas as pd
 import numpy as np
-from models import DatabaseManager, FootballAPIClient
-from common import Config
+import streamlit as st
+from models import FootballAPIClient, get_db
+from controllers.export_controller import PDF_EXPORT_STATE_PREFIX
+from common import CONFIG
+
+
+@st.cache_data(ttl=600)
+def _cached_stats(_controller, version, method_name):
+    """
+    Ejecuta un calculo de StatsController cacheado por version de los datos.
+    
+    La version de la BD forma parte de la clave, de modo que cualquier escritura
+    invalida los calculos previos; el TTL solo refresca los datos de la API.
+    """
+    return getattr(type(_controller), method_name).uncached(_controller)
+
+
+def _versioned_stats(method):
+    """Decora un calculo sin argumentos para cachearlo por version de la BD."""
+    @wraps(method)
+    def wrapper(self):
+        return _cached_stats(self, self.db.data_version, method.__name__)
+    wrapper.uncached = method
+    return wrapper
 
 
 class StatsController:
     """Controlador para operaciones de estadisticas."""
     
     def __init__(self):
-        """Inicializa el controlador con acceso a datos."""
-        self.config = Config()
-        self.db = DatabaseManager(self.config.db_full_path)
-        self.api = FootballAPIClient(self.config.api_key)
+        """Inicializa el controlador; las fuentes de datos se crean bajo demanda."""
+        self.config = CONFIG
+    
+    @cached_property
+    def db(self):
+        """Gestor de base de datos, creado en el primer acceso."""
+        return get_db(self.config.db_full_path)
+    
+    @cached_property
+    def api(self):
+        """Cliente de la API externa, creado en el primer acceso."""
+        return FootballAPIClient(self.config.api_key)
     
     def get_dashboard_metrics(self):
         """
@@ -24,8 +56,25 @@ class StatsController:
         Returns:
             dict: Metricas del dashboard
         """
-        resumen = self.db.get_resumen_liga()
-        standings = self.api.get_la_liga_standings()
+        return self._build_metrics(self.db.get_resumen_liga(), self.api.get_la_liga_standings())
+    
+    @staticmethod
+    def _build_metrics(resumen, standings):
+        """
+        Construye el diccionario de metricas a partir del resumen y la clasificacion.
+        
+        Args:
+            resumen: Resumen de la liga (base de datos)
+            standings: Clasificacion (API)
+        
+        Returns:
+            dict: Metricas del dashboard
+        """
+        if standings.empty:
+            leader, leader_points = '-', 0
+        else:
+            leader = standings['equipo'].iat[0]
+            leader_points = int(standings['pts'].iat[0])
         
         metrics = {
             'total_equipos': int(resumen['total_equipos']),
@@ -34,11 +83,28 @@ class StatsController:
             'total_asistencias': int(resumen['total_asistencias']),
             'valor_medio': round(resumen['valor_medio'], 2),
             'edad_media': round(resumen['edad_media'], 1),
-            'lider': standings.iloc[0]['equipo'] if not standings.empty else '-',
-            'lider_puntos': int(standings.iloc[0]['pts']) if not standings.empty else 0,
+            'lider': leader,
+            'lider_puntos': leader_points,
         }
         return metrics
     
+    def get_dashboard_data(self):
+        """
+        Obtiene todos los datos de la pagina Dashboard en una sola llamada.
+        
+        Las peticiones a la API se lanzan en paralelo con FootballAPIClient.fetch_all.
+        
+        Returns:
+            dict: Metricas, clasificacion, proximos partidos y resultados recientes
+        """
+        standings, upcoming, recent = self.api.fetch_all()
+        return {
+            'metrics': self._build_metrics(self.db.get_resumen_liga(), standings),
+            'standings': standings if not standings.empty else self.db.get_estadisticas_equipos(),
+            'upcoming': upcoming,
+            'recent': recent,
+        }
+    
     def get_classification_data(self):
         """
         Obtiene datos de clasificacion combinando ambas fuentes.
@@ -47,11 +113,9 @@ class StatsController:
             pd.DataFrame: Datos de clasificacion
         """
         api_standings = self.api.get_la_liga_standings()
-        db_stats = self.db.get_estadisticas_equipos()
-        
         if not api_standings.empty:
             return api_standings
-        return db_stats
+        return self.db.get_estadisticas_equipos()
     
     def get_players_analysis(self, equipo_id=None):
         """
@@ -73,11 +137,9 @@ class StatsController:
             pd.DataFrame: Datos de goleadores
         """
         api_scorers = self.api.get_top_scorers_api()
-        db_scorers = self.db.get_top_goleadores()
-        
         if not api_scorers.empty:
             return api_scorers
-        return db_scorers
+        return self.db.get_top_goleadores()
     
     def get_matches_data(self):
         """
@@ -90,6 +152,7 @@ class StatsController:
         recent = self.api.get_recent_results()
         return upcoming, recent
     
+    @_versioned_stats
     def calculate_efficiency_stats(self):
         """
         Calcula estadisticas de eficiencia de equipos.
@@ -102,13 +165,47 @@ class StatsController:
         if stats.empty:
             return pd.DataFrame()
         
-        stats['goles_por_partido'] = (stats['goles_favor'] / stats['partidos_jugados']).round(2)
-        stats['goles_contra_partido'] = (stats['goles_contra'] / stats['partidos_jugados']).round(2)
-        stats['efectividad'] = ((stats['victorias'] / stats['partidos_jugados']) * 100).round(1)
-        stats['puntos_por_partido'] = (stats['puntos'] / stats['partidos_jugados']).round(2)
+        totals = stats[['goles_favor', 'goles_contra', 'victorias', 'puntos']].to_numpy(dtype=np.float64)
+        played = stats['partidos_jugados'].to_numpy(dtype=np.float64)
+        ratios = totals / played[:, np.newaxis]
+        
+        stats['goles_por_partido'] = ratios[:, 0].round(2)
+        stats['goles_contra_partido'] = ratios[:, 1].round(2)
+        stats['efectividad'] = (ratios[:, 2] * 100).round(1)
+        stats['puntos_por_partido'] = ratios[:, 3].round(2)
         
         return stats
     
+    @_versioned_stats
+    def get_team_stats_index(self):
+        """
+        Indexa las estadisticas de equipos por nombre.
+        
+        Returns:
+            dict: Estadisticas de cada equipo (dict) por nombre
+        """
+        stats = self.db.get_estadisticas_equipos()
+        return {row['nombre']: row for row in stats.to_dict('records')}
+    
+    @_versioned_stats
+    def get_teams_index(self):
+        """
+        Indexa los equipos por nombre con su ID, estadisticas y forma reciente.
+        
+        Returns:
+            dict: {'id', 'stats', 'form'} de cada equipo por nombre, en orden alfabetico
+        """
+        equipos = self.db.get_equipos()
+        stats_by_name = self.get_team_stats_index()
+        return {
+            nombre: {
+                'id': equipo_id,
+                'stats': stats_by_name.get(nombre, {}),
+                'form': self.api.get_team_form(nombre),
+            }
+            for nombre, equipo_id in zip(equipos['nombre'].tolist(), equipos['id'].tolist())
+        }
+    
     def get_comparison_data(self, team1, team2):
         """
         Obtiene datos para comparar dos equipos.
@@ -120,25 +217,31 @@ class StatsController:
         Returns:
             dict: Datos de comparacion
         """
-        stats = self.db.get_estadisticas_equipos()
-        
-        team1_stats = stats[stats['nombre'] == team1]
-        team2_stats = stats[stats['nombre'] == team2]
+        teams = self.get_teams_index()
         
         comparison = {
-            'team1': {
-                'nombre': team1,
-                'stats': team1_stats.iloc[0].to_dict() if not team1_stats.empty else {},
-                'form': self.api.get_team_form(team1)
-            },
-            'team2': {
-                'nombre': team2,
-                'stats': team2_stats.iloc[0].to_dict() if not team2_stats.empty else {},
-                'form': self.api.get_team_form(team2)
-            }
+            'team1': self._comparison_entry(teams, team1),
+            'team2': self._comparison_entry(teams, team2),
         }
         return comparison
     
+    def _comparison_entry(self, teams, name):
+        """
+        Construye los datos de comparacion de un equipo a partir del indice de equipos.
+        
+        Args:
+            teams: Indice retornado por get_teams_index
+            name: Nombre del equipo
+        
+        Returns:
+            dict: Nombre, estadisticas y forma reciente del equipo
+        """
+        team = teams.get(name)
+        if team is None:
+            return {'nombre': name, 'stats': {}, 'form': self.api.get_team_form(name)}
+        return {'nombre': name, 'stats': dict(team['stats']), 'form': list(team['form'])}
+    
+    @_versioned_stats
     def get_position_distribution(self):
         """
         Obtiene la distribucion de jugadores por posicion.
@@ -151,18 +254,17 @@ class StatsController:
         if players.empty:
             return pd.DataFrame()
         
-        distribution = players.groupby('posicion').agg({
-            'nombre': 'count',
-            'goles': 'sum',
-            'asistencias': 'sum',
-            'valor_mercado': 'mean'
-        }).reset_index()
-        
-        distribution.columns = ['Posicion', 'Jugadores', 'Goles', 'Asistencias', 'Valor Medio']
+        distribution = players.groupby('posicion', as_index=False).agg(
+            Jugadores=('nombre', 'count'),
+            Goles=('goles', 'sum'),
+            Asistencias=('asistencias', 'sum'),
+            **{'Valor Medio': ('valor_mercado', 'mean')}
+        ).rename(columns={'posicion': 'Posicion'})
         distribution['Valor Medio'] = distribution['Valor Medio'].round(2)
         
         return distribution
     
+    @_versioned_stats
     def get_nationality_stats(self):
         """
         Obtiene estadisticas por nacionalidad.
@@ -175,13 +277,163 @@ class StatsController:
         if players.empty:
             return pd.DataFrame()
         
-        nationality_stats = players.groupby('nacionalidad').agg({
-            'nombre': 'count',
-            'goles': 'sum',
-            'valor_mercado': 'sum'
-        }).reset_index()
-        
-        nationality_stats.columns = ['Nacionalidad', 'Jugadores', 'Goles Totales', 'Valor Total']
+        nationality_stats = players.groupby('nacionalidad', as_index=False).agg(
+            Jugadores=('nombre', 'count'),
+            **{
+                'Goles Totales': ('goles', 'sum'),
+                'Valor Total': ('valor_mercado', 'sum'),
+            }
+        ).rename(columns={'nacionalidad': 'Nacionalidad'})
         nationality_stats = nationality_stats.sort_values('Jugadores', ascending=False)
         
         return nationality_stats
+
+
+@st.cache_resource(show_spinner=False)
+def get_stats_controller():
+    """
+    Retorna un StatsController unico por proceso.
+    
+    El gestor de base de datos mantiene una conexion por hilo, por lo que la
+    instancia puede compartirse entre los hilos de Streamlit sin problemas.
+    
+    Returns:
+        StatsController: Controlador compartido
+    """
+    return StatsController()
+
+
+_SESSION_DATA_PREFIX = 'shared_data_'
+
+# Ventana (segundos) tras la que la sesion vuelve a leer los datos de la API
+SESSION_API_REFRESH_SECONDS = 15 * 60
+
+# Columnas numericas de jugadores y su tipo de reduccion para pd.to_numeric
+# Tipos fijos con margen para los totales de una temporada (int8 desbordaria)
+_PLAYER_DOWNCASTS = {
+    'goles': np.int16,
+    'asistencias': np.int16,
+    'partidos': np.int16,
+    'edad': np.int16,
+    'valor_mercado': np.float32,
+}
+
+
+def _downcast_players(players_df):
+    """
+    Reduce las columnas numericas de jugadores al tipo mas estrecho posible.
+    
+    Plotly serializa todas las filas de cada grafico, por lo que tipos mas
+    estrechos reducen el JSON enviado al navegador. Las columnas con nulos
+    conservan su tipo original.
+    
+    Args:
+        players_df: DataFrame de jugadores
+    
+    Returns:
+        pd.DataFrame: Jugadores con columnas numericas reducidas
+    """
+    downcasts = {
+        col: dtype for col, dtype in _PLAYER_DOWNCASTS.items()
+        if col in players_df.columns and players_df[col].notna().all()
+    }
+    return players_df.astype(downcasts)
+
+
+def _session_cached(name, load, stamp):
+    """
+    Reutiliza un resultado guardado en session_state mientras su sello no cambie.
+    
+    Args:
+        name: Nombre del dato dentro de la sesion
+        load: Funcion sin argumentos que calcula el dato
+        stamp: Sello de vigencia (version de la BD, ventana de tiempo...)
+    
+    Returns:
+        El dato guardado o recien calculado
+    """
+    key = f"{_SESSION_DATA_PREFIX}{name}"
+    entry = st.session_state.get(key)
+    if entry is None or entry[0] != stamp:
+        entry = (stamp, load())
+        st.session_state[key] = entry
+    return entry[1]
+
+
+def _session_players_entry(equipo_id):
+    """
+    Carga una sola vez por version de la BD los jugadores de la sesion.
+    
+    El frame se reduce e indexa por nombre en la misma carga, de modo que la
+    version plana y la indexada comparten origen y nunca se desincronizan.
+    
+    Args:
+        equipo_id: ID del equipo para filtrar
+    
+    Returns:
+        tuple: (jugadores, jugadores indexados por nombre)
+    """
+    controller = get_stats_controller()
+    
+    def load():
+        players = _downcast_players(controller.get_players_analysis(equipo_id))
+        return players, players.set_index('nombre')
+    
+    return _session_cached(f"players_{equipo_id}", load, controller.db.data_version)
+
+
+def get_session_players(equipo_id=None):
+    """
+    Obtiene el analisis de jugadores compartido entre las paginas de la sesion.
+    
+    Args:
+        equipo_id: ID del equipo para filtrar
+    
+    Returns:
+        pd.DataFrame: Datos de jugadores
+    """
+    return _session_players_entry(equipo_id)[0]
+
+
+def get_session_players_indexed(equipo_id=None):
+    """
+    Obtiene los jugadores de la sesion indexados por nombre.
+    
+    Args:
+        equipo_id: ID del equipo para filtrar
+    
+    Returns:
+        pd.DataFrame: Datos de jugadores con 'nombre' como indice
+    """
+    return _session_players_entry(equipo_id)[1]
+
+
+def get_session_scorers():
+    """
+    Obtiene los maximos goleadores compartidos entre las paginas de la sesion.
+    
+    Los goleadores vienen de la API, por lo que el sello combina la version
+    de la BD con una ventana de tiempo: una sesion larga vuelve a leerlos
+    cada SESSION_API_REFRESH_SECONDS en lugar de conservarlos indefinidamente.
+    
+    Returns:
+        pd.DataFrame: Datos de goleadores
+    """
+    controller = get_stats_controller()
+    stamp = (controller.db.data_version, int(time.time() // SESSION_API_REFRESH_SECONDS))
+    return _session_cached('scorers', controller.get_top_scorers_combined, stamp)
+
+
+def clear_session_data():
+    """
+    Descarta los datos compartidos y los PDFs preparados de la sesion.
+    
+    Tambien vacia la cache de goleadores de la API, de modo que la recarga
+    consulta de nuevo la fuente externa. Las lecturas de la BD y los calculos
+    de StatsController no necesitan limpieza: se cachean por version de los
+    datos y se invalidan solos con cada escritura.
+    """
+    prefixes = (_SESSION_DATA_PREFIX, PDF_EXPORT_STATE_PREFIX)
+    for key in [k for k in st.session_state if str(k).startswith(prefixes)]:
+        del st.session_state[key]
+    get_stats_controller().api.get_top_scorers_api.clear()
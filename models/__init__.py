@@ -1,7 +1,7 @@
 """
 Modulo models - Modelos de datos y acceso a base de datos.
 """
-from .database import DatabaseManager
+from .database import DatabaseManager, get_db
 from .api_client import FootballAPIClient
 
-__all__ = ['DatabaseManager', 'FootballAPIClient']
+__all__ = ['DatabaseManager', 'FootballAPIClient', 'get_db']
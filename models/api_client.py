@@ -2,10 +2,182 @@
 Cliente para APIs externas de futbol.
 Maneja las conexiones con Football-Data.org API.
 """
+import functools
+import heapq
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from operator import itemgetter
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# Forma reciente simulada por equipo (V/E/D)
+_TEAM_FORM = {
+    'Real Madrid CF': ['V', 'V', 'V', 'E', 'V'],
+    'FC Barcelona': ['V', 'E', 'V', 'V', 'D'],
+    'Club Atletico de Madrid': ['V', 'V', 'E', 'V', 'E'],
+    'Real Sociedad de Futbol': ['E', 'D', 'V', 'V', 'E'],
+    'Athletic Club': ['V', 'E', 'V', 'D', 'V'],
+    'Real Betis Balompie': ['V', 'V', 'D', 'E', 'V'],
+    'Villarreal CF': ['E', 'V', 'E', 'V', 'E'],
+    'Sevilla FC': ['V', 'E', 'V', 'D', 'E'],
+    'CA Osasuna': ['E', 'V', 'D', 'V', 'V'],
+    'Valencia CF': ['D', 'E', 'V', 'E', 'D'],
+}
+
+# Nombres cortos con los que aparecen los equipos en la base de datos y la API
+_TEAM_ALIASES = {
+    'Real Madrid CF': ('Real Madrid',),
+    'FC Barcelona': ('Barcelona', 'Barca'),
+    'Club Atletico de Madrid': ('Atletico Madrid', 'Atletico de Madrid', 'Atletico'),
+    'Real Sociedad de Futbol': ('Real Sociedad',),
+    'Athletic Club': ('Athletic Bilbao', 'Athletic'),
+    'Real Betis Balompie': ('Real Betis', 'Betis'),
+    'Villarreal CF': ('Villarreal',),
+    'Sevilla FC': ('Sevilla',),
+    'CA Osasuna': ('Osasuna',),
+    'Valencia CF': ('Valencia',),
+}
+
+_UNKNOWN_FORM = ('?', '?', '?', '?', '?')
+
+
+def _normalize_team_name(name):
+    """Normaliza un nombre de equipo: sin acentos, en minusculas y sin espacios extra."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ' '.join(''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().split())
+
+
+# Indice nombre normalizado -> forma, incluyendo los alias
+_FORM_INDEX = {
+    _normalize_team_name(name): form
+    for canonical, form in _TEAM_FORM.items()
+    for name in (canonical, *_TEAM_ALIASES.get(canonical, ()))
+}
+
+# Datos de respaldo cuando la API no esta disponible (columnares, con tipos estrechos)
+_FALLBACK_STANDINGS_DF = pd.DataFrame({
+    'posicion': np.array([1, 2, 3, 4, 5], dtype=np.int8),
+    'equipo': np.array(['Real Madrid', 'FC Barcelona', 'Atletico Madrid', 'Real Sociedad', 'Athletic Bilbao'], dtype=object),
+    'pj': np.array([28, 28, 28, 28, 28], dtype=np.int8),
+    'pg': np.array([20, 19, 15, 14, 14], dtype=np.int8),
+    'pe': np.array([5, 6, 8, 7, 6], dtype=np.int8),
+    'pp': np.array([3, 3, 5, 7, 8], dtype=np.int8),
+    'gf': np.array([58, 62, 42, 38, 42], dtype=np.int16),
+    'gc': np.array([22, 28, 25, 28, 32], dtype=np.int16),
+    'dg': np.array([36, 34, 17, 10, 10], dtype=np.int16),
+    'pts': np.array([65, 63, 53, 49, 48], dtype=np.int16),
+}, copy=False)
+
+_FALLBACK_SCORERS_DF = pd.DataFrame({
+    'jugador': np.array(['Kylian Mbappe', 'Robert Lewandowski', 'Vinicius Junior'], dtype=object),
+    'equipo': np.array(['Real Madrid', 'FC Barcelona', 'Real Madrid'], dtype=object),
+    'goles': np.array([18, 14, 15], dtype=np.int16),
+    'asistencias': np.array([5, 4, 7], dtype=np.int16),
+    'partidos': np.array([26, 25, 25], dtype=np.int16),
+    'minutos': np.array([0, 0, 0], dtype=np.int32),
+}, copy=False)
+
+
+@functools.lru_cache(maxsize=1)
+def _fallback_upcoming_for(today):
+    """Construye los proximos partidos de respaldo relativos a una fecha."""
+    return pd.DataFrame({
+        'fecha': [(today + timedelta(days=1)).isoformat(), (today + timedelta(days=2)).isoformat()],
+        'hora': ['21:00', '18:30'],
+        'local': ['Real Madrid', 'FC Barcelona'],
+        'visitante': ['Sevilla FC', 'Athletic Bilbao'],
+        'competicion': ['La Liga', 'La Liga'],
+    })
+
+
+@functools.lru_cache(maxsize=1)
+def _fallback_results_for(today):
+    """Construye los resultados recientes de respaldo relativos a una fecha."""
+    return pd.DataFrame({
+        'fecha': [(today - timedelta(days=1)).isoformat(), (today - timedelta(days=2)).isoformat()],
+        'local': ['Real Madrid', 'Athletic Bilbao'],
+        'resultado': ['3 - 1', '2 - 2'],
+        'visitante': ['Osasuna', 'FC Barcelona'],
+        'competicion': ['La Liga', 'La Liga'],
+    })
+
+
+# Vigencia de la cache (segundos) segun lo a menudo que cambia cada dato
+_CACHE_TTL = {
+    'standings': 30 * 60,
+    'results': 30 * 60,
+    'upcoming': 6 * 60 * 60,
+    'scorers': 24 * 60 * 60,
+}
+# La consulta conjunta caduca con el dato mas volatil que incluye
+_CACHE_TTL['fetch_all'] = min(_CACHE_TTL['standings'], _CACHE_TTL['results'], _CACHE_TTL['upcoming'])
+
+
+def _ttl_for(dataset):
+    """Retorna el TTL de cache (segundos) de un conjunto de datos de la API."""
+    return _CACHE_TTL[dataset]
+
+
+# Timeouts separados de conexion y lectura (segundos)
+REQUEST_TIMEOUT = (3, 10)
+
+# Espera maxima (segundos) que se respeta de una cabecera Retry-After
+MAX_RETRY_AFTER = 10
+
+# Mensaje mostrado mientras se consulta la API sin datos en cache
+API_SPINNER_TEXT = "Consultando la API de Football-Data..."
+
+
+class _CappedRetry(Retry):
+    """Retry que limita la espera indicada por Retry-After a MAX_RETRY_AFTER."""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+@functools.cache
+def _get_session():
+    """
+    Retorna la sesion HTTP compartida por todos los clientes del proceso.
+    
+    La sesion mantiene las conexiones abiertas (keep-alive) y reintenta los
+    errores transitorios; ante un 429 espera lo indicado en Retry-After,
+    con un maximo de MAX_RETRY_AFTER segundos por reintento.
+    Las cabeceras de autenticacion se envian en cada peticion, ya que
+    dependen de la clave de cada cliente.
+    
+    Returns:
+        requests.Session: Sesion con pool de conexiones
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=_CappedRetry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True
+        )
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
 
 class FootballAPIClient:
@@ -18,167 +190,186 @@ class FootballAPIClient:
         self.headers = {
             'X-Auth-Token': api_key if api_key else ''
         }
+        self._session = _get_session()
     
-    def _make_request(self, endpoint):
+    STANDINGS_ENDPOINT = "competitions/PD/standings"
+    UPCOMING_ENDPOINT = "competitions/PD/matches?status=SCHEDULED"
+    RESULTS_ENDPOINT = "competitions/PD/matches?status=FINISHED"
+    # Ventana de resultados recientes: evita descargar la temporada completa
+    RESULTS_WINDOW_DAYS = 10
+    SCORERS_ENDPOINT = "competitions/PD/scorers?limit=15"
+    
+    def _request_json(self, endpoint):
+        """
+        Realiza una peticion GET sin interactuar con Streamlit.
+        
+        Puede ejecutarse desde hilos auxiliares; el error se retorna en lugar
+        de mostrarse para que lo notifique el hilo principal.
+        
+        Args:
+            endpoint: Ruta relativa a API_BASE_URL
+        
+        Returns:
+            tuple: (datos JSON o None, mensaje de error o None)
+        """
         try:
             url = f"{self.API_BASE_URL}/{endpoint}"
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self._session.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.warning(f"Error al conectar con la API: {str(e)}")
-            return None
+            return json_loads(response.content), None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return None, str(e)
     
-    @st.cache_data(ttl=3600)
-    def get_la_liga_standings(_self):
-        data = _self._make_request("competitions/PD/standings")
-        
+    def _make_request(self, endpoint):
+        data, error = self._request_json(endpoint)
+        if error is not None:
+            st.warning(f"Error al conectar con la API: {error}")
+        return data
+    
+    def _parse_standings(self, data):
         if not data or 'standings' not in data:
-            return _self._get_fallback_standings()
+            return self._get_fallback_standings()
         
         try:
-            standings = data['standings'][0]['table']
-            standings_list = []
-            for team in standings:
-                standings_list.append({
-                    'posicion': team['position'],
-                    'equipo': team['team']['name'],
-                    'pj': team['playedGames'],
-                    'pg': team['won'],
-                    'pe': team['draw'],
-                    'pp': team['lost'],
-                    'gf': team['goalsFor'],
-                    'gc': team['goalsAgainst'],
-                    'dg': team['goalDifference'],
-                    'pts': team['points']
-                })
-            return pd.DataFrame(standings_list)
-        except (KeyError, IndexError):
-            return _self._get_fallback_standings()
+            table = data['standings'][0]['table']
+            return pd.DataFrame({
+                'posicion': pd.array([team['position'] for team in table], dtype='int64'),
+                'equipo': [team['team']['name'] for team in table],
+                'pj': pd.array([team['playedGames'] for team in table], dtype='int64'),
+                'pg': pd.array([team['won'] for team in table], dtype='int64'),
+                'pe': pd.array([team['draw'] for team in table], dtype='int64'),
+                'pp': pd.array([team['lost'] for team in table], dtype='int64'),
+                'gf': pd.array([team['goalsFor'] for team in table], dtype='int64'),
+                'gc': pd.array([team['goalsAgainst'] for team in table], dtype='int64'),
+                'dg': pd.array([team['goalDifference'] for team in table], dtype='int64'),
+                'pts': pd.array([team['points'] for team in table], dtype='int64'),
+            })
+        except (KeyError, IndexError, TypeError):
+            return self._get_fallback_standings()
     
-    @st.cache_data(ttl=1800)
-    def get_upcoming_matches(_self):
-        data = _self._make_request("competitions/PD/matches?status=SCHEDULED")
-        
+    def _parse_upcoming(self, data):
         if not data or 'matches' not in data:
-            return _self._get_fallback_upcoming()
+            return self._get_fallback_upcoming()
         
         try:
             matches = data['matches'][:10]
-            matches_list = []
-            for match in matches:
-                utc_date = match['utcDate']
-                date_obj = datetime.fromisoformat(utc_date.replace('Z', '+00:00'))
-                matches_list.append({
-                    'fecha': date_obj.strftime('%Y-%m-%d'),
-                    'hora': date_obj.strftime('%H:%M'),
-                    'local': match['homeTeam']['name'],
-                    'visitante': match['awayTeam']['name'],
-                    'competicion': 'La Liga'
-                })
-            return pd.DataFrame(matches_list)
+            # utcDate llega siempre como 'YYYY-MM-DDTHH:MM:SSZ': basta con recortar
+            utc_dates = [match['utcDate'] for match in matches]
+            return pd.DataFrame({
+                'fecha': [utc_date[:10] for utc_date in utc_dates],
+                'hora': [utc_date[11:16] for utc_date in utc_dates],
+                'local': [match['homeTeam']['name'] for match in matches],
+                'visitante': [match['awayTeam']['name'] for match in matches],
+                'competicion': ['La Liga'] * len(matches),
+            })
         except (KeyError, IndexError):
-            return _self._get_fallback_upcoming()
+            return self._get_fallback_upcoming()
     
-    @st.cache_data(ttl=1800)
-    def get_recent_results(_self):
-        data = _self._make_request("competitions/PD/matches?status=FINISHED")
-        
+    def _parse_results(self, data):
         if not data or 'matches' not in data:
-            return _self._get_fallback_results()
+            return self._get_fallback_results()
         
         try:
-            matches = sorted(data['matches'], key=lambda x: x['utcDate'], reverse=True)[:10]
-            results_list = []
-            for match in matches:
-                utc_date = match['utcDate']
-                date_obj = datetime.fromisoformat(utc_date.replace('Z', '+00:00'))
-                home_score = match['score']['fullTime']['home']
-                away_score = match['score']['fullTime']['away']
-                if home_score is not None and away_score is not None:
-                    results_list.append({
-                        'fecha': date_obj.strftime('%Y-%m-%d'),
-                        'local': match['homeTeam']['name'],
-                        'resultado': f"{home_score} - {away_score}",
-                        'visitante': match['awayTeam']['name'],
-                        'competicion': 'La Liga'
-                    })
-            return pd.DataFrame(results_list)
+            # Las fechas ISO en UTC se ordenan correctamente como texto
+            matches = heapq.nlargest(10, data['matches'], key=itemgetter('utcDate'))
+            played = [
+                (match, match['score']['fullTime'])
+                for match in matches
+                if match['score']['fullTime']['home'] is not None
+                and match['score']['fullTime']['away'] is not None
+            ]
+            return pd.DataFrame({
+                'fecha': [match['utcDate'][:10] for match, _ in played],
+                'local': [match['homeTeam']['name'] for match, _ in played],
+                'resultado': [f"{score['home']} - {score['away']}" for _, score in played],
+                'visitante': [match['awayTeam']['name'] for match, _ in played],
+                'competicion': ['La Liga'] * len(played),
+            })
         except (KeyError, IndexError):
-            return _self._get_fallback_results()
+            return self._get_fallback_results()
     
-    @st.cache_data(ttl=3600)
-    def get_top_scorers_api(_self):
-        data = _self._make_request("competitions/PD/scorers?limit=15")
-        
+    def _parse_scorers(self, data):
         if not data or 'scorers' not in data:
-            return _self._get_fallback_scorers()
+            return self._get_fallback_scorers()
         
         try:
             scorers = data['scorers']
-            scorers_list = []
-            for scorer in scorers:
-                scorers_list.append({
-                    'jugador': scorer['player']['name'],
-                    'equipo': scorer['team']['name'],
-                    'goles': scorer.get('goals', 0),
-                    'asistencias': scorer.get('assists', 0) or 0,
-                    'partidos': scorer.get('playedMatches', 0),
-                    'minutos': scorer.get('penalties', 0)
-                })
-            return pd.DataFrame(scorers_list)
+            return pd.DataFrame({
+                'jugador': [scorer['player']['name'] for scorer in scorers],
+                'equipo': [scorer['team']['name'] for scorer in scorers],
+                'goles': [scorer.get('goals', 0) for scorer in scorers],
+                'asistencias': [scorer.get('assists', 0) or 0 for scorer in scorers],
+                'partidos': [scorer.get('playedMatches', 0) for scorer in scorers],
+                'minutos': [scorer.get('penalties', 0) for scorer in scorers],
+            })
         except (KeyError, IndexError):
-            return _self._get_fallback_scorers()
-    
-    @st.cache_data(ttl=3600)
-    def get_team_form(_self, team_name):
-        form_mapping = {
-            'Real Madrid CF': ['V', 'V', 'V', 'E', 'V'],
-            'FC Barcelona': ['V', 'E', 'V', 'V', 'D'],
-            'Club Atletico de Madrid': ['V', 'V', 'E', 'V', 'E'],
-            'Real Sociedad de Futbol': ['E', 'D', 'V', 'V', 'E'],
-            'Athletic Club': ['V', 'E', 'V', 'D', 'V'],
-            'Real Betis Balompie': ['V', 'V', 'D', 'E', 'V'],
-            'Villarreal CF': ['E', 'V', 'E', 'V', 'E'],
-            'Sevilla FC': ['V', 'E', 'V', 'D', 'E'],
-            'CA Osasuna': ['E', 'V', 'D', 'V', 'V'],
-            'Valencia CF': ['D', 'E', 'V', 'E', 'D'],
-        }
-        for key in form_mapping:
-            if team_name in key or key in team_name:
-                return form_mapping[key]
-        return ['?', '?', '?', '?', '?']
+            return self._get_fallback_scorers()
+    
+    def _results_endpoint(self):
+        """Endpoint de partidos finalizados limitado a los ultimos RESULTS_WINDOW_DAYS dias."""
+        today = date.today()
+        date_from = today - timedelta(days=self.RESULTS_WINDOW_DAYS)
+        return f"{self.RESULTS_ENDPOINT}&dateFrom={date_from.isoformat()}&dateTo={today.isoformat()}"
+    
+    @st.cache_data(ttl=_ttl_for('standings'), show_spinner=API_SPINNER_TEXT, max_entries=8)
+    def get_la_liga_standings(_self):
+        return _self._parse_standings(_self._make_request(_self.STANDINGS_ENDPOINT))
+    
+    @st.cache_data(ttl=_ttl_for('upcoming'), show_spinner=API_SPINNER_TEXT, max_entries=8)
+    def get_upcoming_matches(_self):
+        return _self._parse_upcoming(_self._make_request(_self.UPCOMING_ENDPOINT))
+    
+    @st.cache_data(ttl=_ttl_for('results'), show_spinner=API_SPINNER_TEXT, max_entries=8)
+    def get_recent_results(_self):
+        return _self._parse_results(_self._make_request(_self._results_endpoint()))
+    
+    @st.cache_data(ttl=_ttl_for('scorers'), show_spinner=API_SPINNER_TEXT, max_entries=8)
+    def get_top_scorers_api(_self):
+        return _self._parse_scorers(_self._make_request(_self.SCORERS_ENDPOINT))
+    
+    @st.cache_data(ttl=_ttl_for('fetch_all'), show_spinner=API_SPINNER_TEXT, max_entries=8)
+    def fetch_all(_self):
+        """
+        Obtiene clasificacion, proximos partidos y resultados en paralelo.
+        
+        Las tres peticiones se lanzan a la vez sobre la sesion compartida,
+        de modo que el tiempo total es el de la peticion mas lenta. Los
+        goleadores no se incluyen: el Dashboard no los usa y el plan gratuito
+        de la API solo admite 10 peticiones por minuto.
+        
+        Returns:
+            tuple: (clasificacion, proximos, resultados) como DataFrames
+        """
+        endpoints = (
+            _self.STANDINGS_ENDPOINT,
+            _self.UPCOMING_ENDPOINT,
+            _self._results_endpoint(),
+        )
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            responses = list(executor.map(_self._request_json, endpoints))
+        
+        errors = dict.fromkeys(error for _, error in responses if error is not None)
+        for error in errors:
+            st.warning(f"Error al conectar con la API: {error}")
+        
+        (standings, _), (upcoming, _), (results, _) = responses
+        return (
+            _self._parse_standings(standings),
+            _self._parse_upcoming(upcoming),
+            _self._parse_results(results),
+        )
+    
+    def get_team_form(self, team_name):
+        return list(_FORM_INDEX.get(_normalize_team_name(team_name), _UNKNOWN_FORM))
     
     def _get_fallback_standings(_self):
-        standings_data = [
-            {'posicion': 1, 'equipo': 'Real Madrid', 'pj': 28, 'pg': 20, 'pe': 5, 'pp': 3, 'gf': 58, 'gc': 22, 'dg': 36, 'pts': 65},
-            {'posicion': 2, 'equipo': 'FC Barcelona', 'pj': 28, 'pg': 19, 'pe': 6, 'pp': 3, 'gf': 62, 'gc': 28, 'dg': 34, 'pts': 63},
-            {'posicion': 3, 'equipo': 'Atletico Madrid', 'pj': 28, 'pg': 15, 'pe': 8, 'pp': 5, 'gf': 42, 'gc': 25, 'dg': 17, 'pts': 53},
-            {'posicion': 4, 'equipo': 'Real Sociedad', 'pj': 28, 'pg': 14, 'pe': 7, 'pp': 7, 'gf': 38, 'gc': 28, 'dg': 10, 'pts': 49},
-            {'posicion': 5, 'equipo': 'Athletic Bilbao', 'pj': 28, 'pg': 14, 'pe': 6, 'pp': 8, 'gf': 42, 'gc': 32, 'dg': 10, 'pts': 48},
-        ]
-        return pd.DataFrame(standings_data)
+        return _FALLBACK_STANDINGS_DF.copy(deep=False)
     
     def _get_fallback_upcoming(_self):
-        today = datetime.now()
-        matches_data = [
-            {'fecha': (today + timedelta(days=1)).strftime('%Y-%m-%d'), 'hora': '21:00', 'local': 'Real Madrid', 'visitante': 'Sevilla FC', 'competicion': 'La Liga'},
-            {'fecha': (today + timedelta(days=2)).strftime('%Y-%m-%d'), 'hora': '18:30', 'local': 'FC Barcelona', 'visitante': 'Athletic Bilbao', 'competicion': 'La Liga'},
-        ]
-        return pd.DataFrame(matches_data)
+        return _fallback_upcoming_for(date.today()).copy(deep=False)
     
     def _get_fallback_results(_self):
-        today = datetime.now()
-        results_data = [
-            {'fecha': (today - timedelta(days=1)).strftime('%Y-%m-%d'), 'local': 'Real Madrid', 'resultado': '3 - 1', 'visitante': 'Osasuna', 'competicion': 'La Liga'},
-            {'fecha': (today - timedelta(days=2)).strftime('%Y-%m-%d'), 'local': 'Athletic Bilbao', 'resultado': '2 - 2', 'visitante': 'FC Barcelona', 'competicion': 'La Liga'},
-        ]
-        return pd.DataFrame(results_data)
+        return _fallback_results_for(date.today()).copy(deep=False)
     
     def _get_fallback_scorers(_self):
-        scorers_data = [
-            {'jugador': 'Kylian Mbappe', 'equipo': 'Real Madrid', 'goles': 18, 'asistencias': 5, 'partidos': 26, 'minutos': 0},
-            {'jugador': 'Robert Lewandowski', 'equipo': 'FC Barcelona', 'goles': 14, 'asistencias': 4, 'partidos': 25, 'minutos': 0},
-            {'jugador': 'Vinicius Junior', 'equipo': 'Real Madrid', 'goles': 15, 'asistencias': 7, 'partidos': 25, 'minutos': 0},
-        ]
-        return pd.DataFrame(scorers_data)
+        return _FALLBACK_SCORERS_DF.copy(deep=False)
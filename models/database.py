@@ -3,11 +3,62 @@ Modulo de gestion de base de datos SQLite.
 Maneja todas las operaciones de base de datos de la aplicacion.
 """
 import sqlite3
+import functools
+import threading
 import pandas as pd
 from pathlib import Path
 from contextlib import contextmanager
 import streamlit as st
 
+# Limite conservador de parametros por sentencia en SQLite
+_SQLITE_MAX_VARIABLES = 999
+
+# Numero de goleadores precalculados en top_goleadores_mv
+TOP_GOLEADORES_MV_SIZE = 10
+
+_TOP_GOLEADORES_SQL = '''
+    SELECT j.nombre, j.posicion, j.nacionalidad, j.goles, j.asistencias, 
+           j.partidos, e.nombre as equipo
+    FROM jugadores j
+    JOIN equipos e ON j.equipo_id = e.id
+    ORDER BY j.goles DESC
+'''
+
+_RESUMEN_LIGA_SQL = '''
+    SELECT 
+        COUNT(DISTINCT e.id) as total_equipos,
+        COUNT(DISTINCT j.id) as total_jugadores,
+        SUM(j.goles) as total_goles,
+        SUM(j.asistencias) as total_asistencias,
+        AVG(j.valor_mercado) as valor_medio,
+        AVG(j.edad) as edad_media
+    FROM equipos e
+    LEFT JOIN jugadores j ON e.id = j.equipo_id
+'''
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_read(_db, db_key, version, method_name, args, kwargs):
+    """
+    Ejecuta una lectura de DatabaseManager cacheada por contenido.
+    
+    La clave incluye la ruta de la base de datos y su version de datos, de modo
+    que cualquier escritura invalida las lecturas previas sin depender de un TTL.
+    """
+    return getattr(type(_db), method_name).uncached(_db, *args, **dict(kwargs))
+
+
+def _versioned_cache(method):
+    """Decora una lectura para cachearla por (base de datos, version, argumentos)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return _cached_read(
+            self, str(self.db_path), self._version, method.__name__,
+            args, tuple(sorted(kwargs.items()))
+        )
+    wrapper.uncached = method
+    return wrapper
+
 
 class DatabaseManager:
     """Gestor de base de datos SQLite."""
@@ -20,6 +71,8 @@ class DatabaseManager:
             db_path: Ruta al archivo de base de datos
         """
         self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._version = 0
         self._ensure_directory()
         self._initialize_database()
     
@@ -27,19 +80,57 @@ class DatabaseManager:
         """Asegura que el directorio de la base de datos exista."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
     
+    def _connection(self):
+        """
+        Retorna la conexion del hilo actual, abriendola si hace falta.
+        
+        Streamlit lanza un hilo nuevo (ScriptRunner) en cada rerun, por lo que
+        la conexion dura lo que una ejecucion del script y se reutiliza entre
+        todas las consultas de esa ejecucion. Con una conexion por hilo y WAL
+        las lecturas concurrentes no se bloquean entre si. La conexion trabaja
+        en modo autocommit y las escrituras usan _transaction.
+        
+        Returns:
+            sqlite3.Connection: Conexion del hilo
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+            )
+            self._local.conn = conn
+        return conn
+    
     @contextmanager
-    def _get_connection(self):
-        """Context manager para conexiones a la base de datos."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+    def _transaction(self):
+        """Context manager de escritura: BEGIN IMMEDIATE, y COMMIT o ROLLBACK al salir."""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
         try:
             yield conn
-        finally:
-            conn.close()
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        self._bump()
+    
+    def _bump(self):
+        """Incrementa la version de los datos, invalidando las lecturas cacheadas."""
+        self._version += 1
+    
+    @property
+    def data_version(self):
+        """Version actual de los datos; cambia tras cada escritura confirmada."""
+        return self._version
     
     def _initialize_database(self):
         """Inicializa las tablas de la base de datos."""
-        with self._get_connection() as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -104,15 +195,17 @@ class DatabaseManager:
                 )
             ''')
             
-            conn.commit()
-            
-            cursor.execute("SELECT COUNT(*) FROM equipos")
-            if cursor.fetchone()[0] == 0:
-                self._insert_sample_data(cursor)
-                conn.commit()
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jug_equipo ON jugadores(equipo_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jug_goles ON jugadores(goles DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_est_temp_equipo ON estadisticas_equipo(temporada, equipo_id)')
+        
+        if self._connection().execute("SELECT COUNT(*) FROM equipos").fetchone()[0] == 0:
+            self._insert_sample_data()
+        
+        self.refresh_mv()
     
-    def _insert_sample_data(self, cursor):
-        """Inserta datos de ejemplo en la base de datos."""
+    def _insert_sample_data(self):
+        """Inserta datos de ejemplo en la base de datos en una unica transaccion."""
         equipos = [
             ('Real Madrid', 'La Liga', 'Espana', 1902, 'Santiago Bernabeu', 81044),
             ('FC Barcelona', 'La Liga', 'Espana', 1899, 'Spotify Camp Nou', 99354),
@@ -125,10 +218,6 @@ class DatabaseManager:
             ('Valencia CF', 'La Liga', 'Espana', 1919, 'Mestalla', 49430),
             ('Osasuna', 'La Liga', 'Espana', 1920, 'El Sadar', 23516),
         ]
-        cursor.executemany(
-            'INSERT INTO equipos (nombre, liga, pais, fundacion, estadio, capacidad) VALUES (?, ?, ?, ?, ?, ?)',
-            equipos
-        )
         
         jugadores = [
             ('Vinicius Junior', 1, 'Extremo Izquierdo', 'Brasil', 24, 180.0, 15, 7, 25),
@@ -147,12 +236,6 @@ class DatabaseManager:
             ('Hugo Duro', 9, 'Delantero Centro', 'Espana', 25, 25.0, 11, 3, 24),
             ('Ante Budimir', 10, 'Delantero Centro', 'Croacia', 33, 8.0, 13, 2, 27),
         ]
-        cursor.executemany(
-            '''INSERT INTO jugadores 
-               (nombre, equipo_id, posicion, nacionalidad, edad, valor_mercado, goles, asistencias, partidos) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            jugadores
-        )
         
         estadisticas = [
             (1, '2024-25', 28, 20, 5, 3, 58, 22, 65, 58.5, 16.2, 89.3),
@@ -166,23 +249,92 @@ class DatabaseManager:
             (9, '2024-25', 28, 10, 10, 8, 32, 35, 40, 49.7, 11.8, 81.2),
             (10, '2024-25', 28, 11, 9, 8, 38, 36, 42, 45.2, 11.2, 79.8),
         ]
-        cursor.executemany(
-            '''INSERT INTO estadisticas_equipo 
-               (equipo_id, temporada, partidos_jugados, victorias, empates, derrotas, 
-                goles_favor, goles_contra, puntos, posesion_media, tiros_partido, pases_completados) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            estadisticas
-        )
+        
+        with self._transaction() as conn:
+            self._bulk_insert(
+                conn, 'equipos',
+                ('nombre', 'liga', 'pais', 'fundacion', 'estadio', 'capacidad'),
+                equipos
+            )
+            self._bulk_insert(
+                conn, 'jugadores',
+                ('nombre', 'equipo_id', 'posicion', 'nacionalidad', 'edad', 'valor_mercado',
+                 'goles', 'asistencias', 'partidos'),
+                jugadores
+            )
+            self._bulk_insert(
+                conn, 'estadisticas_equipo',
+                ('equipo_id', 'temporada', 'partidos_jugados', 'victorias', 'empates', 'derrotas',
+                 'goles_favor', 'goles_contra', 'puntos', 'posesion_media', 'tiros_partido',
+                 'pases_completados'),
+                estadisticas
+            )
+    
+    @staticmethod
+    def _bulk_insert(conn, table, columns, rows):
+        """
+        Inserta filas con sentencias INSERT de varias filas (VALUES (...), (...)).
+        
+        Las filas se agrupan para no superar el limite de parametros por
+        sentencia de SQLite (SQLITE_MAX_VARIABLE_NUMBER, 999 en versiones antiguas).
+        
+        Args:
+            conn: Conexion con la transaccion abierta
+            table: Nombre de la tabla
+            columns: Columnas a insertar
+            rows: Secuencia de tuplas con los valores
+        """
+        row_placeholder = f"({', '.join('?' * len(columns))})"
+        column_list = ', '.join(columns)
+        batch_size = max(1, _SQLITE_MAX_VARIABLES // len(columns))
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            placeholders = ', '.join([row_placeholder] * len(batch))
+            params = [value for row in batch for value in row]
+            conn.execute(f'INSERT INTO {table} ({column_list}) VALUES {placeholders}', params)
     
-    @st.cache_data(ttl=3600)
-    def get_equipos(_self):
+    def _query_to_df(self, sql, params=()):
+        """
+        Ejecuta una consulta y construye el DataFrame columna a columna.
+        
+        Args:
+            sql: Consulta SQL
+            params: Parametros de la consulta
+        
+        Returns:
+            pd.DataFrame: Resultado de la consulta
+        """
+        cursor = self._connection().execute(sql, params)
+        rows = cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
+        
+        if not rows:
+            return pd.DataFrame({column: [] for column in columns})
+        return pd.DataFrame({column: list(values) for column, values in zip(columns, zip(*rows))})
+    
+    def refresh_mv(self):
+        """
+        Recalcula las tablas materializadas de lectura frecuente.
+        
+        Debe llamarse tras cualquier escritura en jugadores o equipos para que
+        top_goleadores_mv y resumen_liga_mv reflejen los datos actuales.
+        """
+        with self._transaction() as conn:
+            conn.execute('DROP TABLE IF EXISTS top_goleadores_mv')
+            conn.execute(
+                f'CREATE TABLE top_goleadores_mv AS {_TOP_GOLEADORES_SQL} '
+                f'LIMIT {int(TOP_GOLEADORES_MV_SIZE)}'
+            )
+            conn.execute('DROP TABLE IF EXISTS resumen_liga_mv')
+            conn.execute(f'CREATE TABLE resumen_liga_mv AS {_RESUMEN_LIGA_SQL}')
+    
+    @_versioned_cache
+    def get_equipos(self):
         """Obtiene todos los equipos."""
-        with _self._get_connection() as conn:
-            df = pd.read_sql_query("SELECT * FROM equipos ORDER BY nombre", conn)
-        return df
+        return self._query_to_df("SELECT * FROM equipos ORDER BY nombre")
     
-    @st.cache_data(ttl=3600)
-    def get_jugadores(_self, equipo_id=None):
+    @_versioned_cache
+    def get_jugadores(self, equipo_id=None):
         """
         Obtiene jugadores, opcionalmente filtrados por equipo.
         
@@ -194,16 +346,16 @@ class DatabaseManager:
             FROM jugadores j 
             LEFT JOIN equipos e ON j.equipo_id = e.id
         '''
+        params = ()
         if equipo_id:
-            query += f' WHERE j.equipo_id = {equipo_id}'
+            query += ' WHERE j.equipo_id = ?'
+            params = (int(equipo_id),)
         query += ' ORDER BY j.goles DESC'
         
-        with _self._get_connection() as conn:
-            df = pd.read_sql_query(query, conn)
-        return df
+        return self._query_to_df(query, params)
     
-    @st.cache_data(ttl=3600)
-    def get_estadisticas_equipos(_self, temporada='2024-25'):
+    @_versioned_cache
+    def get_estadisticas_equipos(self, temporada='2024-25'):
         """
         Obtiene estadisticas de equipos para una temporada.
         
@@ -217,39 +369,39 @@ class DatabaseManager:
             WHERE est.temporada = ?
             ORDER BY est.puntos DESC
         '''
-        with _self._get_connection() as conn:
-            df = pd.read_sql_query(query, conn, params=(temporada,))
-        return df
+        return self._query_to_df(query, (temporada,))
     
-    @st.cache_data(ttl=3600)
-    def get_top_goleadores(_self, limit=10):
+    @_versioned_cache
+    def get_top_goleadores(self, limit=10):
         """Obtiene los maximos goleadores."""
-        query = '''
-            SELECT j.nombre, j.posicion, j.nacionalidad, j.goles, j.asistencias, 
-                   j.partidos, e.nombre as equipo
-            FROM jugadores j
-            JOIN equipos e ON j.equipo_id = e.id
-            ORDER BY j.goles DESC
-            LIMIT ?
-        '''
-        with _self._get_connection() as conn:
-            df = pd.read_sql_query(query, conn, params=(limit,))
-        return df
+        if limit <= TOP_GOLEADORES_MV_SIZE:
+            query = 'SELECT * FROM top_goleadores_mv ORDER BY rowid LIMIT ?'
+        else:
+            query = f'{_TOP_GOLEADORES_SQL} LIMIT ?'
+        return self._query_to_df(query, (limit,))
     
-    @st.cache_data(ttl=3600)
-    def get_resumen_liga(_self):
+    @_versioned_cache
+    def get_resumen_liga(self):
         """Obtiene un resumen general de la liga."""
-        query = '''
-            SELECT 
-                COUNT(DISTINCT e.id) as total_equipos,
-                COUNT(DISTINCT j.id) as total_jugadores,
-                SUM(j.goles) as total_goles,
-                SUM(j.asistencias) as total_asistencias,
-                AVG(j.valor_mercado) as valor_medio,
-                AVG(j.edad) as edad_media
-            FROM equipos e
-            LEFT JOIN jugadores j ON e.id = j.equipo_id
-        '''
-        with _self._get_connection() as conn:
-            df = pd.read_sql_query(query, conn)
-        return df.iloc[0].to_dict()
+        cursor = self._connection().execute('SELECT * FROM resumen_liga_mv')
+        row = cursor.fetchone()
+        columns = [description[0] for description in cursor.description]
+        return dict(zip(columns, row))
+
+
+@st.cache_resource(show_spinner=False)
+def get_db(db_path):
+    """
+    Retorna un DatabaseManager unico por ruta y proceso.
+    
+    El esquema y los datos de ejemplo se comprueban una sola vez. Las sesiones
+    comparten el gestor, pero cada hilo abre su propia conexion (ver
+    DatabaseManager._connection).
+    
+    Args:
+        db_path: Ruta al archivo de base de datos
+    
+    Returns:
+        DatabaseManager: Gestor compartido
+    """
+    return DatabaseManager(db_path)
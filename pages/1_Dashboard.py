@@ -2,17 +2,39 @@
 Pagina de Dashboard principal.
 Muestra metricas generales y visualizaciones de La Liga.
 """
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
-from controllers import StatsController, ExportController
-from common import AuthManager
+from common.bootstrap import st, px, AuthManager, Utils, ExportController, get_stats_controller
+
+
+@st.cache_resource(show_spinner=False)
+def _controllers():
+    """Retorna los controladores de la pagina, creados una sola vez por proceso."""
+    return get_stats_controller(), ExportController()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _dashboard_payload():
+    """
+    Carga de una vez todos los datos de la pagina.
+    
+    Returns:
+        tuple: (metricas, clasificacion, eficiencia, proximos partidos, resultados)
+    """
+    controller, _ = _controllers()
+    dashboard_data = controller.get_dashboard_data()
+    return (
+        dashboard_data['metrics'],
+        dashboard_data['standings'],
+        controller.calculate_efficiency_stats(),
+        dashboard_data['upcoming'],
+        dashboard_data['recent'],
+    )
 
 
 def render_metrics(metrics):
@@ -55,7 +77,7 @@ def render_classification_chart(standings_df):
         return
     
     fig = px.bar(
-        standings_df.head(10),
+        standings_df.iloc[:10],
         x='equipo',
         y='pts',
         color='pts',
@@ -79,24 +101,21 @@ def render_goals_analysis(standings_df):
     if standings_df.empty:
         return
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Goles a Favor',
-        x=standings_df['equipo'],
-        y=standings_df['gf'],
-        marker_color='#4CAF50'
-    ))
+    goals_long = standings_df[['equipo', 'gf', 'gc']].rename(
+        columns={'gf': 'Goles a Favor', 'gc': 'Goles en Contra'}
+    ).melt('equipo', var_name='tipo', value_name='goles')
     
-    fig.add_trace(go.Bar(
-        name='Goles en Contra',
-        x=standings_df['equipo'],
-        y=standings_df['gc'],
-        marker_color='#F44336'
-    ))
+    fig = px.bar(
+        goals_long,
+        x='equipo',
+        y='goles',
+        color='tipo',
+        barmode='group',
+        color_discrete_map={'Goles a Favor': '#4CAF50', 'Goles en Contra': '#F44336'},
+        labels={'equipo': 'Equipo', 'goles': 'Goles', 'tipo': ''}
+    )
     
     fig.update_layout(
-        barmode='group',
         title='Goles a Favor vs Goles en Contra',
         xaxis_tickangle=-45,
         height=400,
@@ -185,16 +204,13 @@ def run():
     st.title("Dashboard - La Liga")
     st.markdown("---")
     
-    controller = StatsController()
-    export_controller = ExportController()
+    _, export_controller = _controllers()
+    metrics, standings, efficiency_stats, upcoming, recent = _dashboard_payload()
     
-    metrics = controller.get_dashboard_metrics()
     render_metrics(metrics)
     
     st.markdown("---")
     
-    standings = controller.get_classification_data()
-    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -205,7 +221,6 @@ def run():
     
     st.markdown("---")
     
-    efficiency_stats = controller.calculate_efficiency_stats()
     if not efficiency_stats.empty:
         render_efficiency_scatter(efficiency_stats)
     
@@ -213,8 +228,6 @@ def run():
     
     col3, col4 = st.columns(2)
     
-    upcoming, recent = controller.get_matches_data()
-    
     with col3:
         st.subheader("Proximos Partidos")
         render_upcoming_matches(upcoming)
@@ -230,8 +243,12 @@ def run():
     
     with col_exp1:
         if not standings.empty:
-            pdf_data = export_controller.generate_classification_pdf(standings, metrics)
-            export_controller.render_export_button(pdf_data, "clasificacion_laliga.pdf")
+            export_controller.render_lazy_export_button(
+                lambda: export_controller.generate_classification_pdf(standings, metrics),
+                "clasificacion_laliga.pdf",
+                key="clasificacion",
+                stamp=(Utils.hash_dataframe(standings), metrics)
+            )
     
     with col_exp2:
         export_controller.render_print_button()
@@ -2,25 +2,53 @@
 Pagina de Analisis de Jugadores.
 Permite explorar estadisticas detalladas de jugadores de La Liga.
 """
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
-from controllers import StatsController, ExportController
-from common import AuthManager
+from common.bootstrap import (
+    st, px, go, pd, np,
+    AuthManager,
+    Utils,
+    ExportController,
+    get_stats_controller,
+    get_session_players,
+    get_session_players_indexed,
+    get_session_scorers,
+    clear_session_data,
+)
 
 
-def render_top_scorers_chart(scorers_df):
-    """Renderiza el grafico de maximos goleadores."""
-    if scorers_df.empty:
-        st.warning("No hay datos de goleadores disponibles")
-        return
-    
+@st.cache_resource(show_spinner=False)
+def _controllers():
+    """Retorna los controladores de la pagina, creados una sola vez por proceso."""
+    return get_stats_controller(), ExportController()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _equipo_filter():
+    """
+    Prepara las opciones del filtro lateral de equipos.
+    
+    Returns:
+        tuple: (opciones del selector con 'Todos' primero, indice de equipos por nombre)
+    """
+    equipos = _controllers()[0].get_teams_index()
+    return ('Todos', *equipos), equipos
+
+
+TOP_SCORERS_CHART_SIZE = 20
+TOP_NATIONALITIES = 15
+
+_FIGURE_CACHE = dict(max_entries=32, show_spinner=False, hash_funcs={pd.DataFrame: Utils.hash_dataframe})
+
+
+@st.cache_data(**_FIGURE_CACHE)
+def _build_top_scorers_fig(scorers_df):
+    """Construye el grafico de maximos goleadores (cacheado por contenido)."""
     fig = px.bar(
         scorers_df,
         x='jugador' if 'jugador' in scorers_df.columns else 'nombre',
@@ -42,15 +70,21 @@ def render_top_scorers_chart(scorers_df):
         showlegend=True,
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_goals_assists_scatter(players_df):
-    """Renderiza grafico de dispersion goles vs asistencias."""
-    if players_df.empty:
+def render_top_scorers_chart(scorers_df):
+    """Renderiza el grafico de maximos goleadores."""
+    if scorers_df.empty:
+        st.warning("No hay datos de goleadores disponibles")
         return
     
+    st.plotly_chart(_build_top_scorers_fig(scorers_df.head(TOP_SCORERS_CHART_SIZE)), use_container_width=True)
+
+
+@st.cache_data(**_FIGURE_CACHE)
+def _build_goals_assists_fig(players_df):
+    """Construye el grafico de dispersion goles vs asistencias (cacheado por contenido)."""
     fig = px.scatter(
         players_df,
         x='goles',
@@ -71,15 +105,26 @@ def render_goals_assists_scatter(players_df):
     fig.update_layout(
         height=450
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_position_distribution(distribution_df):
-    """Renderiza la distribucion por posiciones."""
-    if distribution_df.empty:
+def render_goals_assists_scatter(players_df):
+    """Renderiza grafico de dispersion goles vs asistencias (omite jugadores sin goles ni asistencias)."""
+    if players_df.empty:
         return
     
+    # Suma en float64: los tipos reducidos de la sesion podrian desbordar
+    contributions = players_df['goles'].to_numpy(dtype=np.float64) + players_df['asistencias'].to_numpy(dtype=np.float64)
+    scatter_df = players_df[contributions > 0]
+    if scatter_df.empty:
+        return
+    
+    st.plotly_chart(_build_goals_assists_fig(scatter_df), use_container_width=True)
+
+
+@st.cache_data(**_FIGURE_CACHE)
+def _build_position_distribution_fig(distribution_df):
+    """Construye el grafico de distribucion por posiciones (cacheado por contenido)."""
     fig = px.pie(
         distribution_df,
         values='Jugadores',
@@ -90,15 +135,20 @@ def render_position_distribution(distribution_df):
     
     fig.update_traces(textposition='inside', textinfo='percent+label')
     fig.update_layout(height=400)
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_nationality_chart(nationality_df):
-    """Renderiza estadisticas por nacionalidad."""
-    if nationality_df.empty:
+def render_position_distribution(distribution_df):
+    """Renderiza la distribucion por posiciones."""
+    if distribution_df.empty:
         return
     
+    st.plotly_chart(_build_position_distribution_fig(distribution_df), use_container_width=True)
+
+
+@st.cache_data(**_FIGURE_CACHE)
+def _build_nationality_fig(nationality_df):
+    """Construye el treemap de nacionalidades (cacheado por contenido)."""
     fig = px.treemap(
         nationality_df,
         path=['Nacionalidad'],
@@ -109,34 +159,54 @@ def render_nationality_chart(nationality_df):
     )
     
     fig.update_layout(height=400)
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_player_comparison(players_df, selected_players):
-    """Renderiza comparacion entre jugadores seleccionados."""
-    if len(selected_players) < 2:
-        st.info("Seleccione al menos 2 jugadores para comparar")
-        return
-    
-    comparison_df = players_df[players_df['nombre'].isin(selected_players)]
-    
-    if comparison_df.empty:
+def _collapse_nationalities(nationality_df, top_n=TOP_NATIONALITIES):
+    """
+    Agrupa las nacionalidades fuera de las top_n con mas jugadores en "Otros".
+    
+    Args:
+        nationality_df: Estadisticas por nacionalidad, ordenadas por jugadores
+        top_n: Numero de nacionalidades que se muestran por separado
+    
+    Returns:
+        pd.DataFrame: Estadisticas con la cola agregada en una sola fila
+    """
+    if len(nationality_df) <= top_n:
+        return nationality_df
+    
+    top = nationality_df.iloc[:top_n]
+    tail = nationality_df.iloc[top_n:].drop(columns='Nacionalidad').sum()
+    others = pd.DataFrame([{'Nacionalidad': 'Otros', **tail.to_dict()}])
+    return pd.concat([top, others], ignore_index=True)
+
+
+def render_nationality_chart(nationality_df):
+    """Renderiza estadisticas por nacionalidad."""
+    if nationality_df.empty:
         return
     
+    st.plotly_chart(_build_nationality_fig(_collapse_nationalities(nationality_df)), use_container_width=True)
+
+
+@st.cache_data(**_FIGURE_CACHE)
+def _build_player_comparison_fig(comparison_df):
+    """Construye el radar de comparacion de jugadores (cacheado por contenido)."""
     categories = ['goles', 'asistencias', 'partidos']
     
     fig = go.Figure()
     
-    for _, player in comparison_df.iterrows():
-        values = [player[cat] for cat in categories]
-        values.append(values[0])
-        
+    names = comparison_df['nombre'].tolist()
+    values_matrix = comparison_df[categories].to_numpy().tolist()
+    theta = categories + [categories[0]]
+    
+    for name, values in zip(names, values_matrix):
         fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories + [categories[0]],
+            r=values + [values[0]],
+            theta=theta,
             fill='toself',
-            name=player['nombre']
+            name=name
         ))
     
     fig.update_layout(
@@ -147,8 +217,42 @@ def render_player_comparison(players_df, selected_players):
         title='Comparacion de Jugadores',
         height=400
     )
+    return fig
+
+
+def render_player_comparison(players_by_name, selected_players):
+    """Renderiza comparacion entre jugadores seleccionados (jugadores indexados por nombre)."""
+    if len(selected_players) < 2:
+        st.info("Seleccione al menos 2 jugadores para comparar")
+        return
+    
+    selected = players_by_name.index.intersection(selected_players)
+    comparison_df = players_by_name.loc[selected].reset_index()
+    
+    if comparison_df.empty:
+        return
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_player_comparison_fig(comparison_df), use_container_width=True)
+
+
+@st.fragment
+def _player_comparison_fragment(players_by_name):
+    """
+    Renderiza el selector y el radar de comparacion como fragmento.
+    
+    Anadir o quitar jugadores solo vuelve a ejecutar este fragmento.
+    
+    Args:
+        players_by_name: DataFrame de jugadores indexado por nombre
+    """
+    player_names = players_by_name.index.tolist()
+    selected_players = st.multiselect(
+        "Seleccione jugadores a comparar",
+        player_names,
+        default=player_names[:2] if len(player_names) >= 2 else player_names
+    )
+    
+    render_player_comparison(players_by_name, selected_players)
 
 
 def render_players_table(players_df):
@@ -157,10 +261,12 @@ def render_players_table(players_df):
         st.warning("No hay datos de jugadores disponibles")
         return
     
-    display_df = players_df.copy()
+    display_df = players_df
     
     if 'valor_mercado' in display_df.columns:
-        display_df['valor_mercado'] = display_df['valor_mercado'].apply(lambda x: f"{x:.1f}M")
+        display_df = display_df.assign(
+            valor_mercado=np.char.mod('%.1fM', display_df['valor_mercado'].to_numpy(dtype=float))
+        )
     
     column_config = {
         "nombre": st.column_config.TextColumn("Jugador", width="medium"),
@@ -196,24 +302,28 @@ def run():
     st.title("Analisis de Jugadores")
     st.markdown("---")
     
-    controller = StatsController()
-    export_controller = ExportController()
+    stats_controller, export_controller = _controllers()
     
     with st.sidebar:
         st.subheader("Filtros")
         
-        equipos_df = controller.db.get_equipos()
-        equipos_list = ['Todos'] + equipos_df['nombre'].tolist()
-        selected_equipo = st.selectbox("Equipo", equipos_list)
+        equipo_options, equipos = _equipo_filter()
+        selected_equipo = st.selectbox("Equipo", equipo_options)
+        equipo_id = equipos[selected_equipo]['id'] if selected_equipo in equipos else None
         
-        equipo_id = None
-        if selected_equipo != 'Todos':
-            equipo_row = equipos_df[equipos_df['nombre'] == selected_equipo]
-            if not equipo_row.empty:
-                equipo_id = equipo_row.iloc[0]['id']
+        if st.button("Refrescar datos", use_container_width=True):
+            clear_session_data()
     
-    players_df = controller.get_players_analysis(equipo_id)
-    scorers_df = controller.get_top_scorers_combined()
+    players_df = get_session_players(equipo_id)
+    scorers_df = get_session_scorers()
+    
+    if players_df.empty:
+        avg_goals, avg_assists, top_scorer = 0, 0, "-"
+    else:
+        goles_arr = players_df['goles'].to_numpy()
+        avg_goals = goles_arr.mean()
+        avg_assists = players_df['asistencias'].to_numpy().mean()
+        top_scorer = players_df['nombre'].iat[goles_arr.argmax()]
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -221,15 +331,12 @@ def run():
         st.metric("Total Jugadores", len(players_df))
     
     with col2:
-        avg_goals = players_df['goles'].mean() if not players_df.empty else 0
         st.metric("Media Goles", f"{avg_goals:.1f}")
     
     with col3:
-        avg_assists = players_df['asistencias'].mean() if not players_df.empty else 0
         st.metric("Media Asistencias", f"{avg_assists:.1f}")
     
     with col4:
-        top_scorer = players_df.loc[players_df['goles'].idxmax()]['nombre'] if not players_df.empty else "-"
         st.metric("Maximo Goleador", top_scorer)
     
     st.markdown("---")
@@ -253,24 +360,17 @@ def run():
             render_goals_assists_scatter(players_df)
         
         with col_b:
-            position_dist = controller.get_position_distribution()
+            position_dist = stats_controller.get_position_distribution()
             render_position_distribution(position_dist)
         
-        nationality_stats = controller.get_nationality_stats()
+        nationality_stats = stats_controller.get_nationality_stats()
         render_nationality_chart(nationality_stats)
     
     with tab3:
         st.subheader("Comparar Jugadores")
         
         if not players_df.empty:
-            player_names = players_df['nombre'].tolist()
-            selected_players = st.multiselect(
-                "Seleccione jugadores a comparar",
-                player_names,
-                default=player_names[:2] if len(player_names) >= 2 else player_names
-            )
-            
-            render_player_comparison(players_df, selected_players)
+            _player_comparison_fragment(get_session_players_indexed(equipo_id))
     
     st.markdown("---")
     
@@ -284,8 +384,12 @@ def run():
     
     with col_exp1:
         if not players_df.empty:
-            pdf_data = export_controller.generate_players_pdf(players_df)
-            export_controller.render_export_button(pdf_data, "analisis_jugadores.pdf")
+            export_controller.render_lazy_export_button(
+                lambda: export_controller.generate_players_pdf(players_df),
+                "analisis_jugadores.pdf",
+                key=f"jugadores_{equipo_id}",
+                stamp=Utils.hash_dataframe(players_df)
+            )
     
     with col_exp2:
         export_controller.render_print_button()
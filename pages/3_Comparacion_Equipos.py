@@ -2,100 +2,181 @@
 Pagina de Comparacion de Equipos.
 Permite comparar estadisticas entre dos equipos de La Liga.
 """
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 import sys
+import html
+from operator import itemgetter
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
-from controllers import StatsController, ExportController
-from common import AuthManager
+from common.bootstrap import (
+    st, go, pd, np,
+    AuthManager,
+    Utils,
+    ExportController,
+    get_stats_controller,
+    get_session_players,
+)
+
+
+@st.cache_resource(show_spinner=False)
+def _controllers():
+    """Retorna los controladores de la pagina, creados una sola vez por proceso."""
+    return get_stats_controller(), ExportController()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _equipo_names():
+    """
+    Retorna los equipos disponibles para comparar.
+    
+    Returns:
+        tuple: (nombres de los equipos, dict de posicion por nombre)
+    """
+    names = tuple(_controllers()[0].get_teams_index())
+    return names, {name: i for i, name in enumerate(names)}
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_comparison(team1_name, team2_name):
+    """
+    Retorna los datos de comparacion de una pareja de equipos.
+    
+    Args:
+        team1_name: Nombre del primer equipo
+        team2_name: Nombre del segundo equipo
+    
+    Returns:
+        dict: Datos de comparacion
+    """
+    return _controllers()[0].get_comparison_data(team1_name, team2_name)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_report_inputs():
+    """
+    Carga la clasificacion y las metricas del informe completo.
+    
+    Returns:
+        tuple: (clasificacion, metricas)
+    """
+    controller = _controllers()[0]
+    return controller.get_classification_data(), controller.get_dashboard_metrics()
+
+
+def _render_report_export(export_controller):
+    """
+    Renderiza la exportacion del informe completo.
+    
+    El informe no depende de los equipos comparados, por lo que usa una
+    unica clave y se sella con el contenido de sus datos de entrada,
+    reutilizando los jugadores ya cargados en la sesion.
+    
+    Args:
+        export_controller: Controlador de exportacion
+    """
+    standings, metrics = _cached_report_inputs()
+    players = get_session_players()
+    export_controller.render_lazy_export_button(
+        lambda: export_controller.generate_full_report_pdf(standings, players, metrics),
+        "informe_completo.pdf",
+        key="informe_completo",
+        stamp=(Utils.hash_dataframe(standings), Utils.hash_dataframe(players), metrics)
+    )
+
+
+_FORM_BADGE = {
+    'V': '<span style="background-color:#4CAF50;color:white;padding:5px 10px;margin:2px;border-radius:3px;">V</span>',
+    'E': '<span style="background-color:#FFC107;color:black;padding:5px 10px;margin:2px;border-radius:3px;">E</span>',
+    'D': '<span style="background-color:#F44336;color:white;padding:5px 10px;margin:2px;border-radius:3px;">D</span>',
+}
+_FORM_BADGE_UNKNOWN = '<span style="background-color:#9E9E9E;color:white;padding:5px 10px;margin:2px;border-radius:3px;">?</span>'
+_METRIC_TILE = (
+    '<div><div style="font-size:0.875rem;opacity:0.7;">{label}</div>'
+    '<div style="font-size:1.75rem;">{value}</div></div>'
+)
+_TEAM_CARD_TEMPLATE = (
+    '<h3>{nombre}</h3>'
+    '<div style="display:grid;grid-template-columns:1fr 1fr;gap:1rem;margin-bottom:1rem;">{tiles}</div>'
+    '<p><strong>Forma Reciente:</strong></p>'
+    '<div>{form}</div>'
+)
+# Metricas de la tarjeta en orden de lectura: (etiqueta, clave, valor por defecto, formato)
+_CARD_METRICS = (
+    ('Puntos', 'puntos', '-', '{}'),
+    ('Posesion', 'posesion_media', 0, '{:.1f}%'),
+    ('Victorias', 'victorias', '-', '{}'),
+    ('Derrotas', 'derrotas', '-', '{}'),
+    ('Goles a Favor', 'goles_favor', '-', '{}'),
+    ('Goles en Contra', 'goles_contra', '-', '{}'),
+)
 
 
 def render_team_card(team_data):
-    """Renderiza una tarjeta con informacion del equipo."""
+    """Renderiza una tarjeta con informacion del equipo en un unico bloque HTML."""
     stats = team_data.get('stats', {})
     form = team_data.get('form', [])
     
-    st.markdown(f"### {team_data['nombre']}")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.metric("Puntos", stats.get('puntos', '-'))
-        st.metric("Victorias", stats.get('victorias', '-'))
-        st.metric("Goles a Favor", stats.get('goles_favor', '-'))
-    
-    with col2:
-        st.metric("Posesion", f"{stats.get('posesion_media', 0):.1f}%")
-        st.metric("Derrotas", stats.get('derrotas', '-'))
-        st.metric("Goles en Contra", stats.get('goles_contra', '-'))
-    
-    st.markdown("**Forma Reciente:**")
-    form_html = ""
-    for result in form:
-        if result == 'V':
-            form_html += '<span style="background-color:#4CAF50;color:white;padding:5px 10px;margin:2px;border-radius:3px;">V</span>'
-        elif result == 'E':
-            form_html += '<span style="background-color:#FFC107;color:black;padding:5px 10px;margin:2px;border-radius:3px;">E</span>'
-        elif result == 'D':
-            form_html += '<span style="background-color:#F44336;color:white;padding:5px 10px;margin:2px;border-radius:3px;">D</span>'
-        else:
-            form_html += '<span style="background-color:#9E9E9E;color:white;padding:5px 10px;margin:2px;border-radius:3px;">?</span>'
+    tiles = ''.join(
+        _METRIC_TILE.format(label=label, value=fmt.format(stats.get(key, default)))
+        for label, key, default, fmt in _CARD_METRICS
+    )
     
-    st.markdown(form_html, unsafe_allow_html=True)
+    st.markdown(
+        _TEAM_CARD_TEMPLATE.format(
+            nombre=html.escape(team_data['nombre']),
+            tiles=tiles,
+            form=''.join(_FORM_BADGE.get(result, _FORM_BADGE_UNKNOWN) for result in form)
+        ),
+        unsafe_allow_html=True
+    )
 
 
-def render_radar_comparison(comparison_data):
-    """Renderiza grafico radar de comparacion."""
+# Metricas del radar relativas al maximo de ambos equipos y metricas ya en porcentaje
+_RADAR_RELATIVE_KEYS = ('puntos', 'victorias', 'goles_favor')
+_RADAR_PERCENT_KEYS = ('posesion_media', 'pases_completados')
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_radar_fig(comparison_data):
+    """Construye el grafico radar de comparacion (cacheado por contenido)."""
     team1 = comparison_data['team1']
     team2 = comparison_data['team2']
     
     stats1 = team1.get('stats', {})
     stats2 = team2.get('stats', {})
     
-    if not stats1 or not stats2:
-        st.warning("No hay suficientes datos para la comparacion")
-        return
-    
     categories = ['Puntos', 'Victorias', 'Goles Favor', 'Posesion', 'Pases']
     
-    max_puntos = max(stats1.get('puntos', 1), stats2.get('puntos', 1))
-    max_victorias = max(stats1.get('victorias', 1), stats2.get('victorias', 1))
-    max_goles = max(stats1.get('goles_favor', 1), stats2.get('goles_favor', 1))
-    
-    values1 = [
-        (stats1.get('puntos', 0) / max_puntos) * 100,
-        (stats1.get('victorias', 0) / max_victorias) * 100,
-        (stats1.get('goles_favor', 0) / max_goles) * 100,
-        stats1.get('posesion_media', 0),
-        stats1.get('pases_completados', 0)
-    ]
-    
-    values2 = [
-        (stats2.get('puntos', 0) / max_puntos) * 100,
-        (stats2.get('victorias', 0) / max_victorias) * 100,
-        (stats2.get('goles_favor', 0) / max_goles) * 100,
-        stats2.get('posesion_media', 0),
-        stats2.get('pases_completados', 0)
-    ]
+    raw = np.array(
+        [[stats.get(key, 0) for key in _RADAR_RELATIVE_KEYS] for stats in (stats1, stats2)],
+        dtype=float
+    )
+    maxima = raw.max(axis=0)
+    maxima[maxima == 0] = 1
+    percentages = np.array(
+        [[stats.get(key, 0) for key in _RADAR_PERCENT_KEYS] for stats in (stats1, stats2)],
+        dtype=float
+    )
+    values = np.concatenate([raw / maxima * 100, percentages], axis=1)
+    closed = np.concatenate([values, values[:, :1]], axis=1)
+    theta = categories + [categories[0]]
     
     fig = go.Figure()
     
     fig.add_trace(go.Scatterpolar(
-        r=values1 + [values1[0]],
-        theta=categories + [categories[0]],
+        r=closed[0],
+        theta=theta,
         fill='toself',
         name=team1['nombre'],
         line_color='#1E88E5'
     ))
     
     fig.add_trace(go.Scatterpolar(
-        r=values2 + [values2[0]],
-        theta=categories + [categories[0]],
+        r=closed[1],
+        theta=theta,
         fill='toself',
         name=team2['nombre'],
         line_color='#F44336'
@@ -112,12 +193,30 @@ def render_radar_comparison(comparison_data):
         title='Comparacion de Rendimiento',
         height=450
     )
+    return fig
+
+
+def render_radar_comparison(comparison_data):
+    """Renderiza grafico radar de comparacion."""
+    stats1 = comparison_data['team1'].get('stats', {})
+    stats2 = comparison_data['team2'].get('stats', {})
+    
+    if not stats1 or not stats2:
+        st.warning("No hay suficientes datos para la comparacion")
+        return
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_radar_fig(comparison_data), use_container_width=True)
 
 
-def render_bar_comparison(comparison_data):
-    """Renderiza grafico de barras comparativo."""
+# Metricas del grafico de barras, en el orden de sus categorias
+_BAR_KEYS = ('puntos', 'victorias', 'empates', 'derrotas', 'goles_favor', 'goles_contra')
+_BAR_GET = itemgetter(*_BAR_KEYS)
+_BAR_DEFAULTS = dict.fromkeys(_BAR_KEYS, 0)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_bar_comparison_fig(comparison_data):
+    """Construye el grafico de barras comparativo (cacheado por contenido)."""
     team1 = comparison_data['team1']
     team2 = comparison_data['team2']
     
@@ -126,23 +225,8 @@ def render_bar_comparison(comparison_data):
     
     categories = ['Puntos', 'Victorias', 'Empates', 'Derrotas', 'GF', 'GC']
     
-    values1 = [
-        stats1.get('puntos', 0),
-        stats1.get('victorias', 0),
-        stats1.get('empates', 0),
-        stats1.get('derrotas', 0),
-        stats1.get('goles_favor', 0),
-        stats1.get('goles_contra', 0)
-    ]
-    
-    values2 = [
-        stats2.get('puntos', 0),
-        stats2.get('victorias', 0),
-        stats2.get('empates', 0),
-        stats2.get('derrotas', 0),
-        stats2.get('goles_favor', 0),
-        stats2.get('goles_contra', 0)
-    ]
+    values1 = list(_BAR_GET({**_BAR_DEFAULTS, **stats1}))
+    values2 = list(_BAR_GET({**_BAR_DEFAULTS, **stats2}))
     
     fig = go.Figure()
     
@@ -166,85 +250,84 @@ def render_bar_comparison(comparison_data):
         height=400,
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def render_detailed_table(comparison_data):
-    """Renderiza tabla detallada de comparacion."""
+def render_bar_comparison(comparison_data):
+    """Renderiza grafico de barras comparativo."""
+    st.plotly_chart(_build_bar_comparison_fig(comparison_data), use_container_width=True)
+
+
+# (etiqueta, clave en stats); None marca la diferencia de goles, que se calcula
+_DETAIL_STATS = (
+    ('Partidos Jugados', 'partidos_jugados'),
+    ('Victorias', 'victorias'),
+    ('Empates', 'empates'),
+    ('Derrotas', 'derrotas'),
+    ('Goles a Favor', 'goles_favor'),
+    ('Goles en Contra', 'goles_contra'),
+    ('Diferencia de Goles', None),
+    ('Puntos', 'puntos'),
+)
+_DETAIL_PERCENT_STATS = (
+    ('Posesion Media (%)', 'posesion_media'),
+    ('Tiros por Partido', 'tiros_partido'),
+    ('Pases Completados (%)', 'pases_completados'),
+)
+_DETAIL_LABELS = [label for label, _ in _DETAIL_STATS + _DETAIL_PERCENT_STATS]
+
+
+def _detail_values(stats):
+    """
+    Extrae los valores de la tabla detallada de un equipo.
+    
+    Args:
+        stats: Estadisticas del equipo (dict)
+    
+    Returns:
+        list: Valores en el orden de _DETAIL_LABELS
+    """
+    goal_difference = stats.get('goles_favor', 0) - stats.get('goles_contra', 0)
+    values = [stats.get(key, '-') if key else goal_difference for _, key in _DETAIL_STATS]
+    values.extend(f"{stats.get(key, 0):.1f}" for _, key in _DETAIL_PERCENT_STATS)
+    return values
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_detailed_table(comparison_data):
+    """Construye la tabla detallada de comparacion (cacheada por contenido)."""
     team1 = comparison_data['team1']
     team2 = comparison_data['team2']
     
-    stats1 = team1.get('stats', {})
-    stats2 = team2.get('stats', {})
-    
-    comparison_df = pd.DataFrame({
-        'Estadistica': [
-            'Partidos Jugados',
-            'Victorias',
-            'Empates',
-            'Derrotas',
-            'Goles a Favor',
-            'Goles en Contra',
-            'Diferencia de Goles',
-            'Puntos',
-            'Posesion Media (%)',
-            'Tiros por Partido',
-            'Pases Completados (%)'
-        ],
-        team1['nombre']: [
-            stats1.get('partidos_jugados', '-'),
-            stats1.get('victorias', '-'),
-            stats1.get('empates', '-'),
-            stats1.get('derrotas', '-'),
-            stats1.get('goles_favor', '-'),
-            stats1.get('goles_contra', '-'),
-            stats1.get('goles_favor', 0) - stats1.get('goles_contra', 0),
-            stats1.get('puntos', '-'),
-            f"{stats1.get('posesion_media', 0):.1f}",
-            f"{stats1.get('tiros_partido', 0):.1f}",
-            f"{stats1.get('pases_completados', 0):.1f}"
-        ],
-        team2['nombre']: [
-            stats2.get('partidos_jugados', '-'),
-            stats2.get('victorias', '-'),
-            stats2.get('empates', '-'),
-            stats2.get('derrotas', '-'),
-            stats2.get('goles_favor', '-'),
-            stats2.get('goles_contra', '-'),
-            stats2.get('goles_favor', 0) - stats2.get('goles_contra', 0),
-            stats2.get('puntos', '-'),
-            f"{stats2.get('posesion_media', 0):.1f}",
-            f"{stats2.get('tiros_partido', 0):.1f}",
-            f"{stats2.get('pases_completados', 0):.1f}"
-        ]
+    return pd.DataFrame({
+        'Estadistica': _DETAIL_LABELS,
+        team1['nombre']: _detail_values(team1.get('stats', {})),
+        team2['nombre']: _detail_values(team2.get('stats', {})),
     })
-    
+
+
+def render_detailed_table(comparison_data):
+    """Renderiza tabla detallada de comparacion."""
     st.dataframe(
-        comparison_df,
+        _build_detailed_table(comparison_data),
         use_container_width=True,
         hide_index=True,
         height=450
     )
 
 
-def run():
-    """Funcion principal de la pagina de Comparacion de Equipos."""
-    auth = AuthManager()
-    
-    if not auth.is_authenticated():
-        st.warning("Por favor, inicie sesion para acceder a la comparacion de equipos")
-        return
-    
-    st.title("Comparacion de Equipos")
-    st.markdown("---")
-    
-    controller = StatsController()
-    export_controller = ExportController()
-    
-    equipos_df = controller.db.get_equipos()
-    equipos_list = equipos_df['nombre'].tolist()
-    
+@st.fragment
+def _comparison_fragment(equipos, export_controller):
+    """
+    Renderiza selectores, comparacion y exportacion como fragmento.
+    
+    Cambiar de equipo solo vuelve a ejecutar este fragmento, no la pagina completa.
+    
+    Args:
+        equipos: Tupla (nombres de los equipos, dict de posicion por nombre)
+        export_controller: Controlador de exportacion
+    """
+    equipos_list, equipo_positions = equipos
     col1, col2 = st.columns(2)
     
     with col1:
@@ -256,7 +339,8 @@ def run():
         )
     
     with col2:
-        remaining_teams = [t for t in equipos_list if t != team1_name]
+        i = equipo_positions[team1_name]
+        remaining_teams = equipos_list[:i] + equipos_list[i + 1:]
         team2_name = st.selectbox(
             "Equipo 2",
             remaining_teams,
@@ -266,7 +350,7 @@ def run():
     
     st.markdown("---")
     
-    comparison_data = controller.get_comparison_data(team1_name, team2_name)
+    comparison_data = _cached_comparison(team1_name, team2_name)
     
     col_card1, col_card2 = st.columns(2)
     
@@ -295,14 +379,26 @@ def run():
     col_exp1, col_exp2 = st.columns(2)
     
     with col_exp1:
-        standings = controller.get_classification_data()
-        metrics = controller.get_dashboard_metrics()
-        players = controller.get_players_analysis()
-        pdf_data = export_controller.generate_full_report_pdf(standings, players, metrics)
-        export_controller.render_export_button(pdf_data, f"comparacion_{team1_name}_{team2_name}.pdf")
+        _render_report_export(export_controller)
     
     with col_exp2:
         export_controller.render_print_button()
+
+
+def run():
+    """Funcion principal de la pagina de Comparacion de Equipos."""
+    auth = AuthManager()
+    
+    if not auth.is_authenticated():
+        st.warning("Por favor, inicie sesion para acceder a la comparacion de equipos")
+        return
+    
+    st.title("Comparacion de Equipos")
+    st.markdown("---")
+    
+    _, export_controller = _controllers()
+    
+    _comparison_fragment(_equipo_names(), export_controller)
     
     st.markdown("---")
     st.caption("Datos de Base de Datos SQL y API Externa | Football Analytics Dashboard - John Triguero")